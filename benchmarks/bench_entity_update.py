@@ -0,0 +1,155 @@
+"""Entity update CPU benchmark of the Xiaomi Mi/QingPing Air Quality Monitor component.
+
+Run from the repository root with Home Assistant and python-miio installed:
+
+    python benchmarks/bench_entity_update.py [--rounds 2000] [--budget-us 25]
+
+Measures, without any network I/O, the per-poll cost of decoding a
+canned device response into a status and of the entity path run on each
+poll: async_update of the sensors, switches and numbers reading the
+cached status, plus the name, unique_id and state properties read when
+the state is written. Prints the cost per entity and per 1000 devices
+of each model, and fails when an entity update exceeds the budget.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position
+from custom_components.xiaomi_miio_airquality.cache import AirQualityStatusCache
+from custom_components.xiaomi_miio_airquality.const import (
+    AIRQUALITY_NUMBERS,
+    AIRQUALITY_SENSORS,
+    AIRQUALITY_SWITCHS,
+    AVAILABLE_FEATURES,
+    CONF_MODEL,
+    MODEL_AIRQUALITYMONITOR_LITE,
+    MODEL_AIRQUALITYMONITOR_S1,
+    MODELS_MIIO_W_SWITCH,
+    MODELS_MIOT
+)
+from custom_components.xiaomi_miio_airquality.devices import get_device_class
+from custom_components.xiaomi_miio_airquality.number import XiaomiAirQualityNumber
+from custom_components.xiaomi_miio_airquality.sensor import XiaomiAirQualitySensor
+from custom_components.xiaomi_miio_airquality.switch import XiaomiAirQualitySwitch
+
+HOST = "192.168.1.10"
+TOKEN = "0" * 32
+
+MODELS = [MODEL_AIRQUALITYMONITOR_S1, MODEL_AIRQUALITYMONITOR_LITE]
+
+# canned get_prop response of the miio models
+MIIO_VALUES = {
+    "power": "on",
+    "temperature": 22.4,
+    "humidity": 48.2,
+    "co2": 612,
+    "tvoc": 0.12,
+    "pm25": 8,
+    "pm10": 11,
+    "battery": 100,
+    "battery_state": "charging"
+}
+
+
+class StubHass:
+    """Just enough of Home Assistant for the status cache."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def async_add_executor_job(self, func, *args):
+        """Run the job inline, there is no I/O to wait for."""
+        return func(*args)
+
+
+def create_device(model):
+    """Return a device of a model answering with canned responses."""
+    device = get_device_class(model)(HOST, TOKEN, model=model)
+    if model in MODELS_MIOT:
+        device.get_properties = lambda properties, **kwargs: [
+            {**prop, "code": 0, "value": index + 1} for index, prop in enumerate(properties)
+        ]
+    else:
+        device.send = lambda command, parameters=None: {
+            name: MIIO_VALUES[name] for name in parameters
+        }
+    return device
+
+
+def create_entities(model, device, cache):
+    """Return the entities the platforms set up for a model."""
+    entry_data = {"host": HOST, "token": TOKEN, CONF_MODEL: model}
+    features = AVAILABLE_FEATURES.get(model, [])
+    args = ("Monitor", f"{model}-bench", device, cache)
+    entities = [
+        XiaomiAirQualitySensor(entry_data, description, *args)
+        for description in AIRQUALITY_SENSORS
+        if not features or description.key in features
+    ]
+    if model in MODELS_MIIO_W_SWITCH:
+        entities.extend(
+            XiaomiAirQualitySwitch(entry_data, description, *args)
+            for description in AIRQUALITY_SWITCHS
+        )
+    if model in MODELS_MIOT:
+        entities.extend(
+            XiaomiAirQualityNumber(entry_data, description, *args)
+            for description in AIRQUALITY_NUMBERS
+            if not features or description.key in features
+        )
+    return entities
+
+
+def state_of(entity):
+    """Read the properties written to the state machine."""
+    value = entity.is_on if isinstance(entity, XiaomiAirQualitySwitch) else entity.native_value
+    return entity.name, entity.unique_id, entity.available, value
+
+
+async def bench_model(model, rounds):
+    """Return the decode time and the update time per entity of a model, in us."""
+    device = create_device(model)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        device.status()
+    decode = (time.perf_counter() - start) / rounds * 1e6
+
+    cache = AirQualityStatusCache(StubHass(), device, refresh_interval=3600, max_age=3600)
+    await cache.async_refresh()
+    entities = create_entities(model, device, cache)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for entity in entities:
+            await entity.async_update()
+            state_of(entity)
+    update = (time.perf_counter() - start) / rounds / len(entities) * 1e6
+    return decode, update, len(entities)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--budget-us", type=float, default=25)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'model':22} {'entities':>8} {'decode':>10} {'entity':>10} {'per 1000 devices':>17}")
+    for model in MODELS:
+        decode, update, count = asyncio.run(bench_model(model, args.rounds))
+        # us per device is ms per 1000 devices
+        per_device = decode + update * count
+        print(
+            f"{model:22} {count:8d} {decode:8.1f}us {update:8.1f}us {per_device:14.1f}ms")
+        if update > args.budget_us:
+            print(f"FAIL: {model} entity update over budget ({args.budget_us:.0f} us)")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
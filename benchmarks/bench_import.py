@@ -0,0 +1,80 @@
+"""Import time benchmark of the Xiaomi Mi/QingPing Air Quality Monitor component.
+
+Run from the repository root with Home Assistant and python-miio installed:
+
+    python benchmarks/bench_import.py [--budget-ms 150]
+
+Imports the integration and its platforms in a fresh interpreter with
+-X importtime, prints the cumulative time of each, and fails when the
+total exceeds the budget or when a module that should load lazily was
+imported.
+"""
+import argparse
+import subprocess
+import sys
+
+PACKAGE = "custom_components.xiaomi_miio_airquality"
+PLATFORMS = ["air_quality", "number", "sensor", "switch"]
+
+# shared with Home Assistant and every other miio integration
+PRELOADED = ["homeassistant.core", "homeassistant.helpers.entity", "miio"]
+
+# must only be imported when actually used
+LAZY = [
+    f"{PACKAGE}.airmonitor",
+    f"{PACKAGE}.airmonitor_miot",
+    f"{PACKAGE}.cli",
+    f"{PACKAGE}.config_flow",
+    "homeassistant.components.xiaomi_miio",
+    "micloud",
+]
+
+
+def measure():
+    """Return the cumulative import time in us and the imported modules."""
+    modules = [PACKAGE] + [f"{PACKAGE}.{platform}" for platform in PLATFORMS]
+    code = "import sys\n" + "".join(f"import {name}\n" for name in PRELOADED)
+    code += "print('---', flush=True)\n"
+    code += "".join(f"import {name}\n" for name in modules)
+    code += "print('\\n'.join(sorted(sys.modules)))\n"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True
+    )
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        timings[name.strip()] = int(cumulative)
+    imported = result.stdout.split("---", 1)[1].split()
+    return {name: timings.get(name, 0) for name in modules}, imported
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=150)
+    args = parser.parse_args()
+
+    timings, imported = measure()
+    for name, cumulative in timings.items():
+        print(f"{name:55} {cumulative / 1000:8.1f} ms")
+    total = sum(timings.values()) / 1000
+    print(f"{'total':55} {total:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    for name in LAZY:
+        if any(module == name or module.startswith(name + ".") for module in imported):
+            print(f"FAIL: {name} imported eagerly")
+            failed = True
+    if total > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 """Support for Xiaomi Mi/QingPing Air Quality Monitor."""
 import logging
 from datetime import timedelta
+from functools import partial
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.typing import ConfigType, StateType
@@ -14,10 +15,14 @@ from homeassistant.const import (
 
 from miio import DeviceException
 
+from .aqi import AQI_EPA_NOWCAST, AirQualityIndex
 from .const import (
+    CONF_AQI_STANDARD,
+    CONF_ENTITY_MODE,
     CONF_MODEL,
     DATA_KEY,
     DOMAIN,
+    ENTITY_MODE_FULL,
     MODELS_MIIO,
     MODELS_MIOT
 )
@@ -37,18 +42,26 @@ async def async_setup_entry(
     name = entry.title
     unique_id = entry.unique_id
 
-    airquality = hass.data[DOMAIN][host]
+    if entry.options.get(CONF_ENTITY_MODE, ENTITY_MODE_FULL) != ENTITY_MODE_FULL:
+        # the lightweight modes expose the readings only
+        return
+
+    # hold the device until the entry is unloaded
+    handle = hass.data[DATA_KEY].acquire(host, f"{entry.entry_id}.air_quality")
+    entry.async_on_unload(partial(hass.data[DATA_KEY].release, host, f"{entry.entry_id}.air_quality"))
+    airquality = handle.device
+    cache = handle.cache
 
     try:
         entities = []
 
         if model in MODELS_MIIO:
             entities.extend(
-                [XiaomiAirQuality(entry.options, name, unique_id, airquality)]
+                [XiaomiAirQuality(entry.options, name, unique_id, airquality, cache)]
             )
         if model in MODELS_MIOT:
             entities.extend(
-                [XiaomiAirQuality(entry.options, name, unique_id, airquality)]
+                [XiaomiAirQuality(entry.options, name, unique_id, airquality, cache)]
             )
 
         if len(entities) >= 1:
@@ -62,10 +75,11 @@ class XiaomiAirQuality(AirQualityEntity):
     # pylint: disable=too-many-instance-attributes
     """Representation of a Xiaomi Mi/QingPing Air Quality Monitor."""
 
-    def __init__(self, entry_data, name, unique_id, airquality):
+    def __init__(self, entry_data, name, unique_id, airquality, cache):
         """Initialize the entity."""
         self._host = entry_data[CONF_HOST]
         self._airquality = airquality
+        self._cache = cache
         self._name = name
         self._attr_name = name
         self._attr_unique_id = "{}_{}".format(name, unique_id)
@@ -73,6 +87,7 @@ class XiaomiAirQuality(AirQualityEntity):
         self._mac = entry_data[CONF_TOKEN]
         self._unique_id = unique_id
         self._air_quality_index = None
+        self._aqi = AirQualityIndex(entry_data.get(CONF_AQI_STANDARD, AQI_EPA_NOWCAST))
         self._carbon_dioxide = None
         self._carbon_dioxide_equivalent = None
         self._particulate_matter_2_5 = None
@@ -106,6 +121,11 @@ class XiaomiAirQuality(AirQualityEntity):
 
         return device_info
 
+    @property
+    def available(self) -> bool:
+        """Return true when state is known."""
+        return self._available
+
     @property
     def air_quality_index(self) -> StateType:
         """Return the Air Quality Index (AQI)."""
@@ -133,22 +153,24 @@ class XiaomiAirQuality(AirQualityEntity):
 
     async def async_added_to_hass(self):
         """ add to hass """
-        self.hass.data[DATA_KEY][self._host]["status"] = \
-            await self.hass.async_add_executor_job(self._airquality.status)
+        if self._cache.history is not None:
+            self._aqi.seed(self._cache.history)
+        self.async_on_remove(self._cache.add_listener(self._aqi.update))
+        await self.async_update()
         await super().async_added_to_hass()
 
     async def async_update(self):
         """Fetch state from the device."""
 
         try:
-            state = await self.hass.async_add_executor_job(self._airquality.status)
-            self.hass.data[DATA_KEY][self._host]["status"] = state
+            state = await self._cache.async_get()
             _LOGGER.debug("Got new state: %s", state)
 
             self._carbon_dioxide_equivalent = getattr(state, "co2", None)
             self._carbon_dioxide = getattr(state, "co2", None)
             self._particulate_matter_2_5 = getattr(state, "pm25", None)
             self._total_volatile_organic_compounds = getattr(state, "tvoc", None)
+            self._air_quality_index = self._aqi.value
             self._available = True
 
         except DeviceException as ex:
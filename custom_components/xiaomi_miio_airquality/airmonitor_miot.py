@@ -1,206 +1,129 @@
 """Support for Xiaomi Mi/QingPing Air Quality Monitor."""
 
 import enum
-from typing import Any, Dict
 import logging
-import click
+from functools import lru_cache
+from typing import Iterable, Tuple
 
-from miio.click_common import command, format_output
-from miio.device import DeviceStatus
 from miio.miot_device import MiotDevice
-from .const import (
+from .models import (
+    AVAILABLE_FEATURES,
+    BATTERY_STATE_LITE,
     MODEL_AIRQUALITYMONITOR_LITE,
-    MODEL_AIRQUALITYMONITOR_LITE_DANY
+    MODELS_MIOT
 )
+from .spec import ACCESS_READ, MiotSpec, load_spec
+from .status import CompactStatus, status_class
 
 _LOGGER = logging.getLogger(__name__)
 
 
-MIOT_MAPPING = {
-    MODEL_AIRQUALITYMONITOR_LITE: {
-        "relative-humidity": {"siid": 3, "piid": 1},  # read, notify
-        "pm2.5-density": {"siid": 3, "piid": 4},  # read, notify
-        "pm10-density": {"siid": 3, "piid": 5},  # read, notify
-        "temperature": {"siid": 3, "piid": 7},  # read, notify
-        "co2-density": {"siid": 3, "piid": 8},  # read, notify
-        "battery-level": {"siid": 4, "piid": 1},  # read, notify
-        "charging-state": {"siid": 4, "piid": 2},  # read, notify
-        "voltage": {"siid": 4, "piid": 3},  # read, notify
-        "set-screen-off": {"siid": 9, "aiid": 5},
-        "set-device-off": {"siid": 9, "aiid": 6},
-        "start-time": {"siid": 9, "piid": 2},  # read, write, notify
-        "end-time": {"siid": 9, "piid": 3},  # read, write, notify
-        "monitoring-frequency": {"siid": 9, "piid": 4},  # read, write, notify
-        "screen-off": {"siid": 9, "piid": 5},  # read, write, notify
-        "device-off": {"siid": 9, "piid": 6},  # read, write, notify
-        "tempature-unit": {"siid": 9, "piid": 7},  # read, write, notify
-        "screensaver-time": {"siid": 9, "piid": 8},  # read, write, notify
-        "time-zone": {"siid": 9, "piid": 9},  # read, write, notify
-        "auto-slideing-time": {"siid": 9, "piid": 10},  # read, write, notify
-        "screensaver-type": {"siid": 9, "piid": 11},  # read, write, notify
-        "page-sequence": {"siid": 9, "piid": 12},  # read, write, notify
-        "temp-led-th": {"siid": 9, "piid": 13},  # read, write, notify
-        "humi-led-th": {"siid": 9, "piid": 14},  # read, write, notify
-        "carbondioxide-led-th": {"siid": 9, "piid": 15},  # read, write, notify
-        "pm-tpf-led-th": {"siid": 9, "piid": 16},  # read, write, notify
-        "pm-t-led-th": {"siid": 9, "piid": 17},  # read, write, notify
-        "device-off-new": {"siid": 9, "piid": 18},  # read, write, notify
-        "is-twelve-hours-sys": {"siid": 9, "piid": 19},  # read, write, notify
-        "pm-tpf-standard": {"siid": 9, "piid": 20},  # read, write, notify
-    },
-    MODEL_AIRQUALITYMONITOR_LITE_DANY: {
-        "relative-humidity": {"siid": 3, "piid": 1},  # read, notify
-        "pm2.5-density": {"siid": 3, "piid": 4},  # read, notify
-        "pm10-density": {"siid": 3, "piid": 5},  # read, notify
-        "temperature": {"siid": 3, "piid": 7},  # read, notify
-        "co2-density": {"siid": 3, "piid": 8},  # read, notify
-        "battery-level": {"siid": 4, "piid": 1},  # read, notify
-        "charging-state": {"siid": 4, "piid": 2},  # read, notify
-        "voltage": {"siid": 4, "piid": 3},  # read, notify
-        "set-screen-off": {"siid": 9, "aiid": 5},
-        "set-device-off": {"siid": 9, "aiid": 6},
-        "start-time": {"siid": 9, "piid": 2},  # read, write, notify
-        "end-time": {"siid": 9, "piid": 3},  # read, write, notify
-        "monitoring-frequency": {"siid": 9, "piid": 4},  # read, write, notify
-        "screen-off": {"siid": 9, "piid": 5},  # read, write, notify
-        "device-off": {"siid": 9, "piid": 6},  # read, write, notify
-        "tempature-unit": {"siid": 9, "piid": 7},  # read, write, notify
-        "screensaver-time": {"siid": 9, "piid": 8},  # read, write, notify
-        "time-zone": {"siid": 9, "piid": 9},  # read, write, notify
-        "auto-slideing-time": {"siid": 9, "piid": 10},  # read, write, notify
-        "screensaver-type": {"siid": 9, "piid": 11},  # read, write, notify
-        "page-sequence": {"siid": 9, "piid": 12},  # read, write, notify
-        "temp-led-th": {"siid": 9, "piid": 13},  # read, write, notify
-        "humi-led-th": {"siid": 9, "piid": 14},  # read, write, notify
-        "carbondioxide-led-th": {"siid": 9, "piid": 15},  # read, write, notify
-        "pm-tpf-led-th": {"siid": 9, "piid": 16},  # read, write, notify
-        "pm-t-led-th": {"siid": 9, "piid": 17},  # read, write, notify
-        "device-off-new": {"siid": 9, "piid": 18},  # read, write, notify
-        "is-twelve-hours-sys": {"siid": 9, "piid": 19},  # read, write, notify
-        "pm-tpf-standard": {"siid": 9, "piid": 20},  # read, write, notify
-    }
+# status attribute of the properties not named after their did
+MIOT_ATTRIBUTES = {
+    "relative-humidity": "humidity",
+    "pm2.5-density": "pm25",
+    "pm10-density": "pm10",
+    "co2-density": "co2",
+    "tvoc-density": "tvoc",
+    "battery-level": "battery",
+    "charging-state": "battery_state"
 }
 
 
-class DeviceException(Exception):
-    """Exception wrapping any communication errors with the device."""
-
-
-class AirQualityStatusMiot(DeviceStatus):
-    """Container for status reports for Xiaomi Mi/QingPing Air Quality Monitor."""
-
-    def __init__(self, data: Dict[str, Any]) -> None:
-        """
-        {
-            'id': 1,
-            'result': [
-                {'did': 'relative-humidity', 'siid': 3, 'piid': 1, 'code': 0, 'value': 0},
-                {'did': 'pm2.5-density', 'siid': 3, 'piid': 2, 'code': 0, 'value': 0},
-                {'did': 'temperature', 'siid': 3, 'piid': 3, 'code': 0, 'value': 0},
-                {'did': 'co2-density', 'siid': 3, 'piid': 4, 'code': 0, 'value': 0},
-                {'did': 'tvoc-density', 'siid': 3, 'piid': 5, 'code': 0, 'value': 0},
-                {'did': 'battery-level', 'siid': 4, 'piid': 1, 'code': 0, 'value': 0},
-                {'did': 'charging-state', 'siid': 4, 'piid': 2, 'code': 0, 'value': 0}
-            ],
-            'exe_time': 280
-        }
-        """
-        self.data = data
-
-    @property
-    def humidity(self) -> int:
-        """Relative Humidity"""
-        return self.data["relative-humidity"]
-
-    @property
-    def pm25(self) -> int:
-        """Target pm2.5"""
-        return self.data["pm2.5-density"]
-
-    @property
-    def pm10(self) -> int:
-        """Target pm10"""
-        return self.data["pm10-density"]
-
-    @property
-    def temperature(self) -> float:
-        """Temperature"""
-        return self.data["temperature"]
-
-    @property
-    def co2(self) -> int:
-        """CO2 Density"""
-        return self.data["co2-density"]
-
-    @property
-    def tvoc(self) -> int | None:
-        """TVOC Density"""
-        return self.data.get("tvoc-density", None)
-
-    @property
-    def battery(self) -> int:
-        """Battery Level"""
-        return self.data["battery-level"]
-
-    @property
-    def battery_state(self) -> int:
-        """Charging state"""
-        return self.data["charging-state"]
-
-    @property
-    def voltage(self) -> int:
-        """voltage state"""
-        return self.data["voltage"]
-
-    @property
-    def monitoring_frequency(self) -> int | None:
-        """Monitoring Frequency"""
-        return self.data.get("monitoring-frequency", None)
+# converters of the raw property values, applied while decoding
+MIOT_CONVERTERS = {
+    "charging-state": BATTERY_STATE_LITE.get
+}
 
-    @property
-    def screen_off(self) -> int | None:
-        """Screen Off time"""
-        return self.data.get("screen-off", None)
 
-    @property
-    def device_off(self) -> int | None:
-        """Device Off time"""
-        return self.data.get("device-off", None)
+def status_attribute(did: str) -> str:
+    """Return the status attribute holding the value of a property."""
+    return MIOT_ATTRIBUTES.get(did, did.replace("-", "_"))
 
-    @property
-    def screensaver_time(self) -> int | None:
-        """Screen Saver Time"""
-        return self.data.get("screensaver-time", None)
 
-    @property
-    def auto_slideing_time(self) -> int | None:
-        """Auto Slideing Time"""
-        return self.data.get("auto-slideing-time", None)
+class DeviceException(Exception):
+    """Exception wrapping any communication errors with the device."""
 
-    @property
-    def screensaver_type(self) -> int | None:
-        """Screen Saver Type"""
-        return self.data.get("screensaver-type", None)
 
-    @property
-    def device_off_new(self) -> int | None:
-        """New Device Off time"""
-        return self.data.get("device-off-new", None)
+class AirQualityStatusMiot(CompactStatus):
+    """Container for status reports for Xiaomi Mi/QingPing Air Quality Monitor.
+
+    {
+        'id': 1,
+        'result': [
+            {'did': 'relative-humidity', 'siid': 3, 'piid': 1, 'code': 0, 'value': 0},
+            {'did': 'pm2.5-density', 'siid': 3, 'piid': 2, 'code': 0, 'value': 0},
+            {'did': 'temperature', 'siid': 3, 'piid': 3, 'code': 0, 'value': 0},
+            {'did': 'co2-density', 'siid': 3, 'piid': 4, 'code': 0, 'value': 0},
+            {'did': 'tvoc-density', 'siid': 3, 'piid': 5, 'code': 0, 'value': 0},
+            {'did': 'battery-level', 'siid': 4, 'piid': 1, 'code': 0, 'value': 0},
+            {'did': 'charging-state', 'siid': 4, 'piid': 2, 'code': 0, 'value': 0}
+        ],
+        'exe_time': 280
+    }
+    """
+
+    __slots__ = ()
+    # status attributes of the properties in the bundled specs
+    FIELDS = (
+        "tvoc", "humidity", "pm25", "pm10", "temperature", "co2", "battery",
+        "battery_state", "voltage", "start_time", "end_time",
+        "monitoring_frequency", "screen_off", "device_off", "tempature_unit",
+        "screensaver_time", "time_zone", "auto_slideing_time",
+        "screensaver_type", "page_sequence", "temp_led_th", "humi_led_th",
+        "carbondioxide_led_th", "pm_tpf_led_th", "pm_t_led_th",
+        "device_off_new", "is_twelve_hours_sys", "pm_tpf_standard"
+    )
 
-    @property
-    def is_twelve_hours_sys(self) -> int | None:
-        """Is Twelve Hours Sys"""
-        return self.data.get("is-twelve-hours-sys", None)
 
-    @property
-    def pm_tpf_standard(self) -> int | None:
-        """PM TPF SStandard"""
-        return self.data.get("pm-tpf-standard", None)
+class MiotStatusDecoder:
+    """Decoding table of the properties of a model.
+
+    Maps (siid, piid) of every polled property to its status slot and
+    value converter, so a get_properties response becomes a status in a
+    single pass. Only readable properties are polled, and only those
+    backing one of the wanted attributes when they are given.
+    """
+
+    def __init__(self, spec: MiotSpec, wanted: Tuple[str, ...] | None = None) -> None:
+        self.properties = []
+        self.slots = {}
+        attributes = []
+        for did, siid, piid, access in spec.properties:
+            attribute = status_attribute(did)
+            if not access & ACCESS_READ:
+                continue
+            if wanted is not None and attribute not in wanted:
+                continue
+            self.slots[(siid, piid)] = (len(attributes), MIOT_CONVERTERS.get(did))
+            self.properties.append({"did": did, "siid": siid, "piid": piid})
+            attributes.append(attribute)
+        self.status_class = status_class(AirQualityStatusMiot, tuple(attributes))
+
+    def decode(self, response: list) -> AirQualityStatusMiot:
+        """Return the status of a get_properties response."""
+        values = [None] * len(self.slots)
+        slots = self.slots
+        for prop in response:
+            if prop.get("code", 0) != 0:
+                continue
+            slot = slots.get((prop.get("siid"), prop.get("piid")))
+            if slot is None:
+                continue
+            index, convert = slot
+            value = prop.get("value")
+            values[index] = value if convert is None else convert(value)
+        return self.status_class(*values)
+
+
+@lru_cache(maxsize=None)
+def status_decoder(model: str, wanted: Tuple[str, ...] | None = None) -> MiotStatusDecoder:
+    """Return the decoding table of a model, compiled on first use."""
+    return MiotStatusDecoder(load_spec(model), wanted)
 
 
 class AirQualityMonitorMiot(MiotDevice):
     """Interface for Xiaomi Mi/QingPing Air Quality Monitor Miot"""
-    mapping = MIOT_MAPPING[MODEL_AIRQUALITYMONITOR_LITE]
 
     def __init__(
         self,
@@ -210,52 +133,43 @@ class AirQualityMonitorMiot(MiotDevice):
         debug: int = 0,
         lazy_discover: bool = True,
         model: str = MODEL_AIRQUALITYMONITOR_LITE,
+        attributes: Iterable[str] | None = None,
     ) -> None:
-        if model not in MIOT_MAPPING:
+        if model not in MODELS_MIOT:
             raise DeviceException("Invalid AirQualityMonitorMiot model: %s" % model)
 
+        # the spec is loaded with the first device of a model, not on import
+        self.mapping = load_spec(model).mapping
         super().__init__(ip, token, start_id, debug, lazy_discover)
         self._model = model
+        if attributes is None:
+            attributes = AVAILABLE_FEATURES.get(model)
+        self._decoder = status_decoder(
+            model, tuple(sorted(attributes)) if attributes else None)
 
-    @command(
-        default_output=format_output(
-            "",
-            "Status: {result.status.name}\n"
-        )
-    )
     def status(self) -> AirQualityStatusMiot:
         """Retrieve properties."""
-        return AirQualityStatusMiot(
-            {
-                prop["did"]: prop["value"] if prop["code"] == 0 else None
-                for prop in self.get_properties_for_mapping()
-            }
+        decoder = self._decoder
+        return decoder.decode(
+            self.get_properties(
+                decoder.properties,
+                property_getter="get_properties",
+                max_properties=15
+            )
         )
 
-    @command(
-        click.argument("switch", type=str),
-        default_output=format_output("Setting Switch {switch}"),
-    )
     def set_switch_on(self, switch: str):
         """Set Switch on."""
         if switch in ["screen", "device"] :
             return self.call_action(switch, 0)
         return self.set_property(switch, True)
 
-    @command(
-        click.argument("switch", type=str),
-        default_output=format_output("Setting Switch {switch}"),
-    )
     def set_switch_off(self, switch: str):
         """Set Switch off."""
         if switch in ["screen", "device"] :
             return self.call_action(switch, 1)
         return self.set_property(switch, True)
 
-    @command(
-        click.argument("property", type=str),
-        default_output=format_output("Setting {property} {value}"),
-    )
     def set_value(self, property: str, value: float):
         """Set value."""
         property = property.replace("_", "-")
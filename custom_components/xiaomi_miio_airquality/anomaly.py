@@ -0,0 +1,198 @@
+"""Anomaly detection of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import math
+from typing import Any, Dict, List
+
+from .const import DEFAULT_STUCK_POLLS, DOMAIN
+
+EVENT_ANOMALY = f"{DOMAIN}_anomaly"
+
+ANOMALY_SPIKE = "spike"
+ANOMALY_SURGE = "surge"
+ANOMALY_STUCK = "stuck"
+ANOMALY_IMPLAUSIBLE = "implausible"
+
+# readings checked for implausible values, with the range the sensors
+# can physically report
+PLAUSIBLE_RANGES = {
+    "temperature": (-40, 85),
+    "humidity": (0, 100),
+    "co2": (300, 10000),
+    "pm25": (0, 1000),
+    "pm10": (0, 1000),
+    "tvoc": (0, 10000)
+}
+
+# reading: (EWMA weight, z-score threshold, minimum deviation)
+SPIKE_DETECTION = {
+    "co2": (0.1, 4.0, 150)
+}
+
+# reading: (step threshold, relative step threshold)
+SURGE_DETECTION = {
+    "pm25": (35, 1.0)
+}
+
+# readings noisy enough that an identical value for many polls means a
+# stuck sensor, with the floor they report steadily in clean air; the
+# temperature and humidity are left out, their coarse resolution keeps
+# them flat indoors for hours
+STUCK_DETECTION = {
+    "co2": None,
+    "pm25": 0,
+    "pm10": 0,
+    "tvoc": 0
+}
+
+WARMUP_POLLS = 10
+
+
+class EwmaDetector:
+    """Exponentially weighted mean and variance of a reading.
+
+    A value deviating from the mean by more than threshold standard
+    deviations (and by at least a minimum amount) is a spike. The mean and
+    variance are updated in constant time and memory.
+    """
+
+    __slots__ = ("alpha", "threshold", "minimum", "mean", "variance", "count")
+
+    def __init__(self, alpha: float, threshold: float, minimum: float = 0) -> None:
+        self.alpha = alpha
+        self.threshold = threshold
+        self.minimum = minimum
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+
+    def update(self, value: float) -> float | None:
+        """Add a value, returning its z-score if it is a spike."""
+        self.count += 1
+        if self.count == 1:
+            self.mean = value
+            return None
+        deviation = value - self.mean
+        score = None
+        if self.count > WARMUP_POLLS and abs(deviation) >= self.minimum:
+            deviation_std = math.sqrt(self.variance)
+            if deviation_std and abs(deviation) > self.threshold * deviation_std:
+                score = deviation / deviation_std
+        increment = self.alpha * deviation
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + deviation * increment)
+        return score
+
+
+class StepDetector:
+    """Sudden rise of a reading between two polls."""
+
+    __slots__ = ("threshold", "relative", "previous")
+
+    def __init__(self, threshold: float, relative: float) -> None:
+        self.threshold = threshold
+        self.relative = relative
+        self.previous: float | None = None
+
+    def update(self, value: float) -> float | None:
+        """Add a value, returning the step if it is a surge."""
+        previous = self.previous
+        self.previous = value
+        if previous is None:
+            return None
+        step = value - previous
+        if step >= self.threshold and step >= self.relative * previous:
+            return step
+        return None
+
+
+class StuckDetector:
+    """Reading reporting the identical value poll after poll.
+
+    The floor of the reading, if any, is never considered stuck.
+    """
+
+    __slots__ = ("polls", "floor", "value", "count")
+
+    def __init__(self, polls: int = DEFAULT_STUCK_POLLS, floor: float | None = None) -> None:
+        self.polls = polls
+        self.floor = floor
+        self.value: float | None = None
+        self.count = 0
+
+    def update(self, value: float) -> bool:
+        """Add a value, returning whether the reading is stuck."""
+        if value == self.floor:
+            self.value = None
+            self.count = 0
+        elif value == self.value:
+            self.count += 1
+        else:
+            self.value = value
+            self.count = 1
+        return self.count >= self.polls
+
+
+class AnomalyDetector:
+    """Streaming anomaly detectors over the readings of a device.
+
+    Each status is fed in as it is fetched. An anomaly is reported once
+    when it starts; it is reported again only after the reading went back
+    to normal. stuck_polls 0 disables the stuck detection.
+    """
+
+    def __init__(self, stuck_polls: int = DEFAULT_STUCK_POLLS) -> None:
+        self._spikes = {
+            name: EwmaDetector(*settings) for name, settings in SPIKE_DETECTION.items()
+        }
+        self._surges = {
+            name: StepDetector(*settings) for name, settings in SURGE_DETECTION.items()
+        }
+        self._stuck = {
+            name: StuckDetector(stuck_polls, floor)
+            for name, floor in STUCK_DETECTION.items()
+            if stuck_polls
+        }
+        self._active: set[tuple[str, str]] = set()
+
+    def update(self, timestamp: float, status) -> List[Dict[str, Any]]:
+        """Run the detectors on a status, returning the anomalies starting."""
+        anomalies = []
+        for name, (low, high) in PLAUSIBLE_RANGES.items():
+            value = getattr(status, name, None)
+            if value is None or isinstance(value, str) or value != value:
+                continue
+
+            if not low <= value <= high:
+                self._report(anomalies, name, ANOMALY_IMPLAUSIBLE, True, timestamp, value)
+                # keep the averages clean of readings the sensor cannot take
+                continue
+            self._report(anomalies, name, ANOMALY_IMPLAUSIBLE, False, timestamp, value)
+
+            if name in self._stuck:
+                stuck = self._stuck[name].update(value)
+                self._report(anomalies, name, ANOMALY_STUCK, stuck, timestamp, value,
+                             polls=self._stuck[name].count)
+
+            if name in self._spikes:
+                score = self._spikes[name].update(value)
+                self._report(anomalies, name, ANOMALY_SPIKE, score is not None,
+                             timestamp, value, score=score and round(score, 2))
+            if name in self._surges:
+                step = self._surges[name].update(value)
+                self._report(anomalies, name, ANOMALY_SURGE, step is not None,
+                             timestamp, value, step=step)
+        return anomalies
+
+    def _report(self, anomalies, name, kind, active, timestamp, value, **details) -> None:
+        """Add an anomaly when it becomes active."""
+        key = (name, kind)
+        if not active:
+            self._active.discard(key)
+        elif key not in self._active:
+            self._active.add(key)
+            anomalies.append({
+                "type": kind,
+                "reading": name,
+                "value": value,
+                "timestamp": timestamp,
+                **details
+            })
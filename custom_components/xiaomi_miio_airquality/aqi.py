@@ -0,0 +1,195 @@
+"""Air Quality Index of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import math
+import time
+from collections import deque
+from typing import List, Sequence, Tuple
+
+from .history import ReadingHistory
+
+AQI_EPA_NOWCAST = "epa_nowcast"
+AQI_HJ_633 = "hj_633"
+AQI_CAQI = "caqi"
+
+AQI_STANDARDS = [
+    AQI_EPA_NOWCAST,
+    AQI_HJ_633,
+    AQI_CAQI
+]
+
+# (concentration low, concentration high, index low, index high)
+Breakpoints = Sequence[Tuple[float, float, float, float]]
+
+# US EPA, 2024 revision
+EPA_PM25: Breakpoints = (
+    (0.0, 9.0, 0, 50),
+    (9.1, 35.4, 51, 100),
+    (35.5, 55.4, 101, 150),
+    (55.5, 125.4, 151, 200),
+    (125.5, 225.4, 201, 300),
+    (225.5, 325.4, 301, 500)
+)
+EPA_PM10: Breakpoints = (
+    (0, 54, 0, 50),
+    (55, 154, 51, 100),
+    (155, 254, 101, 150),
+    (255, 354, 151, 200),
+    (355, 424, 201, 300),
+    (425, 604, 301, 500)
+)
+
+# China HJ 633-2012, 24 hour means
+HJ_633_PM25: Breakpoints = (
+    (0, 35, 0, 50),
+    (35, 75, 50, 100),
+    (75, 115, 100, 150),
+    (115, 150, 150, 200),
+    (150, 250, 200, 300),
+    (250, 350, 300, 400),
+    (350, 500, 400, 500)
+)
+HJ_633_PM10: Breakpoints = (
+    (0, 50, 0, 50),
+    (50, 150, 50, 100),
+    (150, 250, 100, 150),
+    (250, 350, 150, 200),
+    (350, 420, 200, 300),
+    (420, 500, 300, 400),
+    (500, 600, 400, 500)
+)
+
+# EU CAQI, background, hourly means
+CAQI_PM25: Breakpoints = (
+    (0, 15, 0, 25),
+    (15, 30, 25, 50),
+    (30, 55, 50, 75),
+    (55, 110, 75, 100)
+)
+CAQI_PM10: Breakpoints = (
+    (0, 25, 0, 25),
+    (25, 50, 25, 50),
+    (50, 90, 50, 75),
+    (90, 180, 75, 100)
+)
+
+
+def index_of(breakpoints: Breakpoints, concentration: float) -> float:
+    """Return the index of a concentration, capped at the top of the scale."""
+    for c_low, c_high, i_low, i_high in breakpoints:
+        if concentration <= c_high:
+            break
+    else:
+        return i_high
+    return i_low + (i_high - i_low) * (concentration - c_low) / (c_high - c_low)
+
+
+def nowcast(hourly: Sequence[float | None]) -> float | None:
+    """Return the NowCast of up to 12 hourly means, most recent first."""
+    hourly = hourly[:12]
+    if sum(value is not None for value in hourly[:3]) < 2:
+        return None
+    valid = [value for value in hourly if value is not None]
+    highest = max(valid)
+    weight = max(min(valid) / highest, 0.5) if highest else 1
+    total = weights = 0
+    factor = 1
+    for value in hourly:
+        if value is not None:
+            total += factor * value
+            weights += factor
+        factor *= weight
+    return total / weights
+
+
+class HourlyAverages:
+    """Hourly means of a reading, updated incrementally."""
+
+    def __init__(self, hours: int = 24) -> None:
+        self._hour = None
+        self._total = 0.0
+        self._count = 0
+        self._closed = deque(maxlen=hours)
+
+    def add(self, timestamp: float, value: float | None) -> None:
+        """Add a reading taken at timestamp."""
+        hour = int(timestamp // 3600)
+        if hour != self._hour:
+            if self._count:
+                self._closed.append((self._hour, self._total / self._count))
+            self._hour = hour
+            self._total = 0.0
+            self._count = 0
+        if value is not None and value == value:
+            self._total += value
+            self._count += 1
+
+    def means(self, now: float, hours: int) -> List[float | None]:
+        """Return the means of the last hours up to now, most recent first."""
+        current = int(now // 3600)
+        means: List[float | None] = [None] * hours
+        if self._count and 0 <= current - self._hour < hours:
+            means[current - self._hour] = self._total / self._count
+        for hour, mean in self._closed:
+            if 0 <= current - hour < hours:
+                means[current - hour] = mean
+        return means
+
+
+class AirQualityIndex:
+    """Air Quality Index of a device from its rolling PM2.5/PM10 means."""
+
+    def __init__(self, standard: str = AQI_EPA_NOWCAST) -> None:
+        self.standard = standard
+        self.value: int | None = None
+        self._pm25 = HourlyAverages()
+        self._pm10 = HourlyAverages()
+
+    def seed(self, history: ReadingHistory, now: float | None = None) -> None:
+        """Load the last 24 hours of readings from a history."""
+        if now is None:
+            now = time.time()
+        pm25 = history.columns.index("pm25")
+        pm10 = history.columns.index("pm10")
+        for timestamp, readings in history.samples(now - 86400, now):
+            self._pm25.add(timestamp, readings[pm25])
+            self._pm10.add(timestamp, readings[pm10])
+        self.value = self._compute(now)
+
+    def update(self, timestamp: float, status) -> None:
+        """Add the readings of a status and recompute the index."""
+        self._pm25.add(timestamp, getattr(status, "pm25", None))
+        self._pm10.add(timestamp, getattr(status, "pm10", None))
+        self.value = self._compute(timestamp)
+
+    def _compute(self, now: float) -> int | None:
+        """Return the index of the current means."""
+        if self.standard == AQI_HJ_633:
+            pm25 = _mean(self._pm25.means(now, 24))
+            pm10 = _mean(self._pm10.means(now, 24))
+            tables = (HJ_633_PM25, HJ_633_PM10)
+        elif self.standard == AQI_CAQI:
+            pm25 = self._pm25.means(now, 1)[0]
+            pm10 = self._pm10.means(now, 1)[0]
+            tables = (CAQI_PM25, CAQI_PM10)
+        else:
+            pm25 = nowcast(self._pm25.means(now, 12))
+            pm10 = nowcast(self._pm10.means(now, 12))
+            if pm25 is not None:
+                pm25 = math.floor(pm25 * 10) / 10
+            if pm10 is not None:
+                pm10 = math.floor(pm10)
+            tables = (EPA_PM25, EPA_PM10)
+
+        indexes = [
+            index_of(table, concentration)
+            for table, concentration in zip(tables, (pm25, pm10))
+            if concentration is not None
+        ]
+        if not indexes:
+            return None
+        return math.ceil(max(indexes)) if self.standard == AQI_HJ_633 else round(max(indexes))
+
+
+def _mean(values: Sequence[float | None]) -> float | None:
+    """Return the mean of the known values."""
+    valid = [value for value in values if value is not None]
+    return sum(valid) / len(valid) if valid else None
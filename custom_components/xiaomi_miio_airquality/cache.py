@@ -0,0 +1,212 @@
+"""Status cache of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, NamedTuple
+
+from homeassistant.core import HomeAssistant
+from miio import DeviceException
+
+from .const import (
+    DEFAULT_MAX_AGE,
+    DEFAULT_SCAN_INTERVAL
+)
+from .executor import DeviceBusy, DeviceExecutor
+from .history import ReadingHistory
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CachedStatus(NamedTuple):
+    """A device status together with the time it was fetched."""
+
+    status: Any
+    fetched_at: float
+    timestamp: float
+    properties: frozenset
+
+
+class AirQualityStatusCache:
+    """Per-device status cache with max-age semantics.
+
+    Entries are immutable and swapped in a single assignment on the event
+    loop, so any platform can read them while a refresh is in flight. Only
+    one refresh per device runs at a time, readers arriving meanwhile wait
+    for it and share its result, also when it failed. Every fetched status
+    is also recorded in the reading history when there is one, then passed
+    to the listeners.
+
+    Device calls run in the executor of the component when given, else in
+    the executor of Home Assistant.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        airquality,
+        refresh_interval: float = DEFAULT_SCAN_INTERVAL,
+        max_age: float = DEFAULT_MAX_AGE,
+        history: ReadingHistory | None = None,
+        executor: DeviceExecutor | None = None
+    ) -> None:
+        self._hass = hass
+        self._executor = executor
+        self._airquality = airquality
+        self._entry: CachedStatus | None = None
+        self._lock = asyncio.Lock()
+        self.refresh_interval = refresh_interval
+        self.max_age = max(max_age, refresh_interval)
+        self.history = history
+        self._listeners: list[Callable[[float, Any], None]] = []
+        self._error_listeners: list[Callable[[int, Exception], None]] = []
+        self.last_error: Exception | None = None
+        self.failures = 0
+        # monotonic time the last refresh failed at, None after a success
+        self._failed_at: float | None = None
+        # totals since the cache was created, for the metrics endpoint
+        self.polls = 0
+        self.errors = 0
+        self.shed = 0
+        self.poll_seconds = 0.0
+
+    @property
+    def entry(self) -> CachedStatus | None:
+        """Return the current cache entry, fresh or not."""
+        return self._entry
+
+    @property
+    def age(self) -> float | None:
+        """Return the age of the cached status in seconds."""
+        entry = self._entry
+        if entry is None:
+            return None
+        return time.monotonic() - entry.fetched_at
+
+    def get(self):
+        """Return the cached status if it is not older than max age."""
+        entry = self._entry
+        if entry is None or time.monotonic() - entry.fetched_at > self.max_age:
+            return None
+        return entry.status
+
+    async def async_get(self, force: bool = False):
+        """Return the status, refreshing it once it is older than the refresh interval.
+
+        With force it is refreshed whatever its age, unless a refresh
+        finished while waiting for the one in flight. A stale status is
+        still served while it is within max age and the device cannot be
+        reached; after that DeviceException is raised. Readers that waited
+        for a refresh which failed get that outcome instead of trying again.
+        """
+        requested = time.monotonic()
+        entry = self._entry
+        if (
+            not force
+            and entry is not None
+            and requested - entry.fetched_at < self.refresh_interval
+        ):
+            return entry.status
+
+        async with self._lock:
+            entry = self._entry
+            if entry is not None and (
+                entry.fetched_at >= requested
+                if force
+                else time.monotonic() - entry.fetched_at < self.refresh_interval
+            ):
+                return entry.status
+            if self._failed_at is not None and self._failed_at >= requested:
+                return self._fallback(self.last_error)
+            try:
+                return (await self.async_refresh()).status
+            except DeviceException as ex:
+                return self._fallback(ex)
+
+    def _fallback(self, error: Exception):
+        """Return the cached status within max age, else raise error."""
+        status = self.get()
+        if status is None:
+            raise error
+        _LOGGER.debug(
+            "Serving cached status of %s, %.0f seconds old",
+            self._airquality.ip, self.age)
+        return status
+
+    async def async_refresh(self) -> CachedStatus:
+        """Fetch the status from the device and store it.
+
+        A poll shed by the saturated executor raises DeviceBusy without
+        counting as a poll or a failure: the device was not asked.
+        """
+        start = time.monotonic()
+        try:
+            status = await self._async_run(self._airquality.status, shed=True)
+            if status is None:
+                raise DeviceException("No status received")
+        except DeviceBusy:
+            self.shed += 1
+            raise
+        except DeviceException as ex:
+            self.polls += 1
+            self.poll_seconds += time.monotonic() - start
+            self.errors += 1
+            self.last_error = ex
+            self._failed_at = time.monotonic()
+            self.failures += 1
+            for listener in list(self._error_listeners):
+                listener(self.failures, ex)
+            raise
+
+        self.polls += 1
+        self.poll_seconds += time.monotonic() - start
+        self.last_error = None
+        self._failed_at = None
+        self.failures = 0
+        self._entry = CachedStatus(
+            status,
+            time.monotonic(),
+            time.time(),
+            frozenset(status.properties())
+        )
+        if self.history is not None:
+            self.history.append(self._entry.timestamp, status)
+        for listener in list(self._listeners):
+            listener(self._entry.timestamp, status)
+        return self._entry
+
+    async def async_call(self, func: Callable, *args):
+        """Run a blocking device command, which is never shed."""
+        return await self._async_run(func, *args, shed=False)
+
+    async def _async_run(self, func: Callable, *args, shed: bool):
+        """Run a blocking device call in the executor."""
+        if self._executor is None:
+            return await self._hass.async_add_executor_job(func, *args)
+        return await self._executor.async_run(func, *args, shed=shed)
+
+    def add_listener(self, listener: Callable[[float, Any], None]) -> Callable[[], None]:
+        """Call listener(timestamp, status) with every fetched status.
+
+        Returns a function removing the listener again.
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def add_error_listener(self, listener: Callable[[int, Exception], None]) -> Callable[[], None]:
+        """Call listener(failures, error) with every failed refresh.
+
+        failures counts the refreshes failed in a row. Returns a function
+        removing the listener again.
+        """
+        self._error_listeners.append(listener)
+        return lambda: self._error_listeners.remove(listener)
+
+    def invalidate(self) -> None:
+        """Force the next reader to refresh the status."""
+        self._entry = None
+
+    def close(self) -> None:
+        """Drop the cached status and the listeners."""
+        self._listeners.clear()
+        self._error_listeners.clear()
+        self._entry = None
@@ -0,0 +1,306 @@
+"""Command line interface of the Xiaomi Mi/QingPing Air Quality Monitor component.
+
+Usage: python -m custom_components.xiaomi_miio_airquality.cli --help
+"""
+import asyncio
+import csv
+import json
+import time
+from functools import update_wrapper
+from typing import Any, Dict, List, Tuple
+
+import click
+from miio.click_common import LiteralParamType
+
+from .models import (
+    MODELS_ALL_DEVICES,
+    MODEL_AIRQUALITYMONITOR_S1
+)
+from .devices import get_device_class
+from .executor import DeviceBusy, DeviceExecutor
+from .history import percentile
+from .traffic import record, replay
+from .transport import SharedTransport, use_shared_transport
+
+
+def create_device(host: str, token: str, model: str):
+    """Return the device of a model."""
+    return get_device_class(model)(host, token, model=model)
+
+
+def pass_device(func):
+    """Add the device options to a command and pass it the device."""
+    @click.option("--ip", envvar="MIROBO_IP", required=True, help="IP address of the device.")
+    @click.option("--token", envvar="MIROBO_TOKEN", required=True, help="API token of the device.")
+    @click.option(
+        "--model",
+        type=click.Choice(MODELS_ALL_DEVICES),
+        default=MODEL_AIRQUALITYMONITOR_S1,
+        show_default=True
+    )
+    @click.option("--record", "record_path", type=click.Path(dir_okay=False),
+                  help="Append the device traffic to this .ndjson.gz recording.")
+    @click.option("--replay", "replay_path", type=click.Path(exists=True, dir_okay=False),
+                  help="Answer from this recording instead of the device.")
+    @click.option("--replay-speed", default=1.0, show_default=True,
+                  help="Factor of the recorded response times when replaying, 0 for none.")
+    def wrapper(ip, token, model, record_path, replay_path, replay_speed, **kwargs):
+        device = create_device(ip, token, model)
+        if replay_path:
+            replay(device, replay_path, replay_speed)
+        elif record_path:
+            recording = record(device, record_path)
+            try:
+                return func(device, **kwargs)
+            finally:
+                recording.close()
+        return func(device, **kwargs)
+    return update_wrapper(wrapper, func)
+
+
+@click.group()
+def cli():
+    """Xiaomi Mi/QingPing Air Quality Monitor tools."""
+
+
+@cli.command()
+@pass_device
+def status(device):
+    """Return device status."""
+    click.echo(device.status())
+
+
+@cli.command()
+@pass_device
+def on(device):
+    """Power on."""
+    click.echo("Powering on")
+    click.echo(device.on())
+
+
+@cli.command()
+@pass_device
+def off(device):
+    """Power off."""
+    click.echo("Powering off")
+    click.echo(device.off())
+
+
+@cli.command()
+@click.argument("display_clock", type=bool)
+@pass_device
+def set_display_clock(device, display_clock: bool):
+    """Enable/disable displaying a clock instead the AQI."""
+    click.echo(
+        "Turning on display clock" if display_clock else "Turning off display clock")
+    device.set_display_clock(display_clock)
+
+
+@cli.command()
+@click.argument("auto_close", type=bool)
+@pass_device
+def set_auto_close(device, auto_close: bool):
+    """Purpose unknown."""
+    click.echo("Turning on auto close" if auto_close else "Turning off auto close")
+    device.set_auto_close(auto_close)
+
+
+@cli.command()
+@click.argument("night_mode", type=bool)
+@pass_device
+def set_night_mode(device, night_mode: bool):
+    """Decrease the brightness of the display."""
+    click.echo("Turning on night mode" if night_mode else "Turning off night mode")
+    device.set_night_mode(night_mode)
+
+
+@cli.command()
+@click.argument("begin_hour", type=int)
+@click.argument("begin_minute", type=int)
+@click.argument("end_hour", type=int)
+@click.argument("end_minute", type=int)
+@pass_device
+def set_night_time(device, begin_hour: int, begin_minute: int,
+                   end_hour: int, end_minute: int):
+    """Enable night mode daily at bedtime."""
+    click.echo(
+        f"Setting night time to {begin_hour}:{begin_minute} - {end_hour}:{end_minute}")
+    device.set_night_time(begin_hour, begin_minute, end_hour, end_minute)
+
+
+@cli.command()
+@click.argument("siid", type=int)
+@click.argument("aiid", type=int)
+@click.argument("params", type=LiteralParamType(), required=False)
+@pass_device
+def call_action_by(device, siid, aiid, params=None):
+    """Call an action."""
+    click.echo(device.call_action_by(siid, aiid, params))
+
+
+@cli.command()
+@click.argument("switch", type=str)
+@pass_device
+def set_switch_on(device, switch: str):
+    """Set Switch on."""
+    click.echo(f"Setting Switch {switch}")
+    click.echo(device.set_switch_on(switch))
+
+
+@cli.command()
+@click.argument("switch", type=str)
+@pass_device
+def set_switch_off(device, switch: str):
+    """Set Switch off."""
+    click.echo(f"Setting Switch {switch}")
+    click.echo(device.set_switch_off(switch))
+
+
+@cli.command()
+@click.argument("property", type=str)
+@click.argument("value", type=float)
+@pass_device
+def set_value(device, property: str, value: float):
+    """Set value."""
+    click.echo(f"Setting {property} {value}")
+    click.echo(device.set_value(property, value))
+
+
+def load_inventory(path: str) -> List[Dict[str, str]]:
+    """Read the devices of an inventory file.
+
+    Either a JSON list of objects or a CSV file with a header, both with
+    host, token and optionally model.
+    """
+    with open(path, encoding="utf-8", newline="") as inventory_file:
+        if path.endswith(".json"):
+            devices = json.load(inventory_file)
+        else:
+            devices = list(csv.DictReader(inventory_file))
+    for device in devices:
+        if not device.get("host") or not device.get("token"):
+            raise click.BadParameter(f"{device} lacks a host or token", param_hint="inventory")
+        device["model"] = device.get("model") or MODEL_AIRQUALITYMONITOR_S1
+        if device["model"] not in MODELS_ALL_DEVICES:
+            raise click.BadParameter(f"unknown model {device['model']}", param_hint="inventory")
+    return devices
+
+
+def summarize(latencies: List[float]) -> Dict[str, float | None]:
+    """Return the latency statistics of successful polls, in ms."""
+    latencies = sorted(latencies)
+    return {
+        "mean": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+        "p50": _ms(percentile(latencies, 50)),
+        "p95": _ms(percentile(latencies, 95)),
+        "p99": _ms(percentile(latencies, 99)),
+        "max": _ms(latencies[-1] if latencies else None)
+    }
+
+
+def _ms(seconds: float | None) -> float | None:
+    """Return seconds in rounded ms."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+async def poll_fleet(
+    devices: List[Dict[str, str]],
+    duration: float,
+    interval: float
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Poll every device each interval for duration, like the integration does.
+
+    The polls go through one SharedTransport and a DeviceExecutor sized
+    for the devices, so latencies include the wait for a worker and polls
+    are shed when the executor is saturated. Returns the results of each
+    device and the final executor metrics.
+    """
+    executor = DeviceExecutor(len(devices))
+    transport = SharedTransport()
+    end = time.monotonic() + duration
+
+    def poll(device) -> None:
+        if device.status() is None:
+            raise ValueError("No status received")
+
+    async def run(index: int, inventory: Dict[str, str]) -> Dict[str, Any]:
+        result = {"host": inventory["host"], "model": inventory["model"],
+                  "polls": 0, "errors": 0, "shed": 0, "last_error": None}
+        latencies = []
+        device = create_device(inventory["host"], inventory["token"], inventory["model"])
+        use_shared_transport(device, transport)
+        # spread the first polls over the interval
+        await asyncio.sleep(interval * index / len(devices))
+        while time.monotonic() < end:
+            started = time.monotonic()
+            try:
+                await executor.async_run(poll, device)
+                latencies.append(time.monotonic() - started)
+            except DeviceBusy:
+                result["shed"] += 1
+            except Exception as ex:  # pylint: disable=broad-except
+                result["errors"] += 1
+                result["last_error"] = repr(ex)
+            result["polls"] += 1
+            await asyncio.sleep(max(0, started + interval - time.monotonic()))
+        result["latency_ms"] = summarize(latencies)
+        result["_latencies"] = latencies
+        return result
+
+    try:
+        results = await asyncio.gather(*[run(index, device) for index, device in enumerate(devices)])
+        return results, executor.metrics()
+    finally:
+        executor.shutdown()
+        transport.close()
+
+
+@cli.command()
+@click.argument("inventory", type=click.Path(exists=True, dir_okay=False))
+@click.option("--duration", default=60.0, show_default=True, help="Seconds to poll for.")
+@click.option("--interval", default=10.0, show_default=True,
+              help="Seconds between the polls of a device.")
+@click.option("--output", type=click.Path(dir_okay=False),
+              help="JSON file receiving the results of each device.")
+def load_test(inventory, duration: float, interval: float, output):
+    """Poll the devices of an inventory file concurrently and report the load."""
+    devices = load_inventory(inventory)
+    click.echo(f"Polling {len(devices)} devices every {interval:g} s for {duration:g} s")
+    started = time.monotonic()
+    results, executor = asyncio.run(poll_fleet(devices, duration, interval))
+    elapsed = time.monotonic() - started
+
+    latencies = []
+    for result in results:
+        latencies.extend(result.pop("_latencies"))
+    polls = sum(result["polls"] for result in results)
+    errors = sum(result["errors"] for result in results)
+    shed = sum(result["shed"] for result in results)
+    stats = summarize(latencies)
+    click.echo(
+        f"Polls: {polls}, errors: {errors} ({errors / polls:.1%}), shed: {shed} ({shed / polls:.1%})"
+        if polls else "No polls")
+    click.echo(f"Executor: {executor['workers']} workers, {executor['completed']} calls completed")
+    click.echo(f"Throughput: {len(latencies) / elapsed:.1f} statuses/s")
+    click.echo("Latency (ms): " + ", ".join(f"{name} {value}" for name, value in stats.items()))
+    for result in results:
+        if result["polls"] and result["errors"] == result["polls"]:
+            click.echo(f"Unreachable: {result['host']} ({result['last_error']})")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as output_file:
+            json.dump({
+                "duration": round(elapsed, 1),
+                "interval": interval,
+                "polls": polls,
+                "errors": errors,
+                "shed": shed,
+                "latency_ms": stats,
+                "executor": executor,
+                "devices": results
+            }, output_file, indent=2)
+        click.echo(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    cli()  # pylint: disable=no-value-for-parameter
@@ -4,14 +4,11 @@ from __future__ import annotations
 from collections.abc import Mapping
 import logging
 from re import search
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from micloud import MiCloud
-from micloud.micloudexception import MiCloudAccessDenied
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.components import zeroconf
 from homeassistant.config_entries import SOURCE_REAUTH, ConfigEntry
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
@@ -26,23 +23,41 @@ from homeassistant.const import (
     CONF_MODEL
 )
 
-from homeassistant.components.xiaomi_miio.const import (
+from .aqi import AQI_EPA_NOWCAST, AQI_STANDARDS
+from .export import EXPORT_CSV, EXPORT_FORMATS
+
+if TYPE_CHECKING:
+    from homeassistant.components import zeroconf
+
+from .const import (
+    CONF_AQI_STANDARD,
     CONF_CLOUD_COUNTRY,
     CONF_CLOUD_PASSWORD,
     CONF_CLOUD_USERNAME,
+    CONF_EXPORT_FORMAT,
+    CONF_EXPORT_INTERVAL,
     CONF_FLOW_TYPE,
+    CONF_HISTORY_RETENTION,
     CONF_MANUAL,
-    DEFAULT_CLOUD_COUNTRY,
-    SERVER_COUNTRY_CODES,
-    AuthException,
-    SetupException
-)
-from homeassistant.components.xiaomi_miio.device import ConnectXiaomiDevice
-
-from .const import (
+    CONF_ANOMALY_DETECTION,
+    CONF_ENTITY_MODE,
+    CONF_MAX_AGE,
+    CONF_SMOOTHING_WINDOW,
+    CONF_STUCK_POLLS,
+    CONF_SYNC_FREQUENCY,
+    CONF_ZONE,
     DOMAIN,
+    DEFAULT_CLOUD_COUNTRY,
+    DEFAULT_EXPORT_INTERVAL,
+    DEFAULT_HISTORY_RETENTION,
+    DEFAULT_MAX_AGE,
     DEFAULT_SCAN_INTERVAL,
-    MODELS_ALL_DEVICES
+    DEFAULT_SMOOTHING_WINDOW,
+    DEFAULT_STUCK_POLLS,
+    ENTITY_MODE_FULL,
+    ENTITY_MODES,
+    MODELS_ALL_DEVICES,
+    SERVER_COUNTRY_CODES
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -77,33 +92,87 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         """Manage the options."""
         errors = {}
         if user_input is not None:
-            use_cloud = user_input.get(CONF_SCAN_INTERVAL, False)
-            cloud_username = self.config_entry.data.get(CONF_CLOUD_USERNAME)
-            cloud_password = self.config_entry.data.get(CONF_CLOUD_PASSWORD)
-            cloud_country = self.config_entry.data.get(CONF_CLOUD_COUNTRY)
+            # the entry data is migrated to the options on setup
+            options = self.config_entry.options
+            cloud_credentials = [
+                options.get(CONF_CLOUD_USERNAME),
+                options.get(CONF_CLOUD_PASSWORD),
+                options.get(CONF_CLOUD_COUNTRY),
+            ]
+            # entries set up through the cloud login keep its credentials
+            use_cloud = any(cloud_credentials)
+            changed = {
+                key for key, value in user_input.items() if options.get(key) != value
+            }
 
-            if use_cloud and (
-                not cloud_username or not cloud_password or not cloud_country
-            ):
+            if use_cloud and not all(cloud_credentials) and changed - {CONF_SCAN_INTERVAL}:
                 errors["base"] = "cloud_credentials_incomplete"
                 # trigger re-auth flow
                 self.hass.async_create_task(
                     self.hass.config_entries.flow.async_init(
                         DOMAIN,
                         context={"source": SOURCE_REAUTH},
-                        data=self.config_entry.data,
+                        data=options,
                     )
                 )
 
             if not errors:
-                return self.async_create_entry(title="", data=user_input)
+                return self.async_create_entry(
+                    title="", data={**self.config_entry.options, **user_input})
 
         settings_schema = vol.Schema(
             {
                 vol.Optional(
                     CONF_SCAN_INTERVAL,
                     default=self.config_entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
-                ): int
+                ): int,
+                vol.Optional(
+                    CONF_MAX_AGE,
+                    default=self.config_entry.options.get(CONF_MAX_AGE, DEFAULT_MAX_AGE),
+                ): int,
+                vol.Optional(
+                    CONF_HISTORY_RETENTION,
+                    default=self.config_entry.options.get(
+                        CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION),
+                ): vol.All(int, vol.Range(min=0, max=168)),
+                vol.Optional(
+                    CONF_AQI_STANDARD,
+                    default=self.config_entry.options.get(CONF_AQI_STANDARD, AQI_EPA_NOWCAST),
+                ): vol.In(AQI_STANDARDS),
+                vol.Optional(
+                    CONF_EXPORT_INTERVAL,
+                    default=self.config_entry.options.get(
+                        CONF_EXPORT_INTERVAL, DEFAULT_EXPORT_INTERVAL),
+                ): vol.All(int, vol.Range(min=0)),
+                vol.Optional(
+                    CONF_EXPORT_FORMAT,
+                    default=self.config_entry.options.get(CONF_EXPORT_FORMAT, EXPORT_CSV),
+                ): vol.In(EXPORT_FORMATS),
+                vol.Optional(
+                    CONF_ZONE,
+                    default=self.config_entry.options.get(CONF_ZONE, ""),
+                ): str,
+                vol.Optional(
+                    CONF_ANOMALY_DETECTION,
+                    default=self.config_entry.options.get(CONF_ANOMALY_DETECTION, False),
+                ): bool,
+                vol.Optional(
+                    CONF_STUCK_POLLS,
+                    default=self.config_entry.options.get(CONF_STUCK_POLLS, DEFAULT_STUCK_POLLS),
+                ): vol.All(int, vol.Range(min=0)),
+                vol.Optional(
+                    CONF_SMOOTHING_WINDOW,
+                    default=self.config_entry.options.get(
+                        CONF_SMOOTHING_WINDOW, DEFAULT_SMOOTHING_WINDOW),
+                ): vol.All(int, vol.Range(min=0, max=1440)),
+                vol.Optional(
+                    CONF_SYNC_FREQUENCY,
+                    default=self.config_entry.options.get(CONF_SYNC_FREQUENCY, False),
+                ): bool,
+                vol.Optional(
+                    CONF_ENTITY_MODE,
+                    default=self.config_entry.options.get(CONF_ENTITY_MODE, ENTITY_MODE_FULL),
+                ): vol.In(ENTITY_MODES)
             }
         )
 
@@ -225,6 +294,10 @@ class XiaomiAirQualityFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                     step_id="cloud", data_schema=DEVICE_CLOUD_CONFIG, errors=errors
                 )
 
+            # pylint: disable=import-outside-toplevel
+            from micloud import MiCloud
+            from micloud.micloudexception import MiCloudAccessDenied
+
             miio_cloud = MiCloud(cloud_username, cloud_password)
             try:
                 if not await self.hass.async_add_executor_job(miio_cloud.login):
@@ -333,6 +406,13 @@ class XiaomiAirQualityFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             self.model = user_input[CONF_MODEL]
 
+        # pylint: disable=import-outside-toplevel
+        from homeassistant.components.xiaomi_miio.const import (
+            AuthException,
+            SetupException
+        )
+        from homeassistant.components.xiaomi_miio.device import ConnectXiaomiDevice
+
         # Try to connect to a Xiaomi Device.
         connect_device_class = ConnectXiaomiDevice(self.hass)
         try:
@@ -368,7 +448,7 @@ class XiaomiAirQualityFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             unique_id, raise_on_progress=False
         )
         if existing_entry:
-            data = existing_entry.data.copy()
+            data = {**existing_entry.options, **existing_entry.data}
             data[CONF_HOST] = self.host
             data[CONF_TOKEN] = self.token
             if (
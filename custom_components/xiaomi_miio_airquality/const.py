@@ -25,57 +25,64 @@ from homeassistant.const import (
     UnitOfTime
 )
 
+from .models import (  # noqa: F401 re-exported for the platforms
+    AVAILABLE_FEATURES,
+    AVAILABLE_FEATURES_COMMON,
+    BATTERY_STATE_LITE,
+    DOMAIN,
+    MODEL_AIRQUALITYMONITOR_LITE,
+    MODEL_AIRQUALITYMONITOR_LITE_DANY,
+    MODEL_AIRQUALITYMONITOR_S1,
+    MODELS_ALL_DEVICES,
+    MODELS_MIIO,
+    MODELS_MIIO_W_SWITCH,
+    MODELS_MIOT,
+    OPT_MODEL
+)
+
 DEFAULT_NAME = "Xiaomi Mi/QingPing Air Quality Monitor"
-DOMAIN = "xiaomi_miio_airquality"
 DOMAINS = ["air_quality", "number", "sensor", "switch"]
 DATA_KEY = "xiaomi_airquality_data"
+DATA_EXPORTER = "xiaomi_airquality_exporter"
+DATA_ZONES = "xiaomi_airquality_zones"
 DATA_STATE = "state"
 DATA_DEVICE = "device"
 
 CONF_MODEL = "model"
 CONF_MAC = "mac"
+CONF_MAX_AGE = "max_age"
+CONF_HISTORY_RETENTION = "history_retention"
+CONF_AQI_STANDARD = "aqi_standard"
+CONF_EXPORT_INTERVAL = "export_interval"
+CONF_EXPORT_FORMAT = "export_format"
+CONF_ZONE = "zone"
+CONF_ANOMALY_DETECTION = "anomaly_detection"
+CONF_STUCK_POLLS = "stuck_polls"
+CONF_SMOOTHING_WINDOW = "smoothing_window"
+CONF_SYNC_FREQUENCY = "sync_monitoring_frequency"
+CONF_ENTITY_MODE = "entity_mode"
 
-MODEL_AIRQUALITYMONITOR_S1 = "cgllc.airmonitor.s1"
-
-MODEL_AIRQUALITYMONITOR_LITE = "cgllc.airm.cgdn1"
-MODEL_AIRQUALITYMONITOR_LITE_DANY = "cgllc.airm.cgd1st"
-
-
-OPT_MODEL = {
-    MODEL_AIRQUALITYMONITOR_S1: "QingPing Air Quality Monitor",
-    MODEL_AIRQUALITYMONITOR_LITE: "QingPing Air Quality Monitor Lite",
-    MODEL_AIRQUALITYMONITOR_LITE_DANY: "QingPing Air Quality Monitor Lite (Dany ESP32)"
-}
-
-
-MODELS_MIIO = [
-    MODEL_AIRQUALITYMONITOR_S1
-]
-
-MODELS_MIIO_W_SWITCH = [
-    MODEL_AIRQUALITYMONITOR_LITE,
-    MODEL_AIRQUALITYMONITOR_LITE_DANY
-]
-
-MODELS_MIOT = [
-    MODEL_AIRQUALITYMONITOR_LITE,
-    MODEL_AIRQUALITYMONITOR_LITE_DANY
-]
-
-MODELS_ALL_DEVICES = MODELS_MIIO + MODELS_MIOT
-
-AVAILABLE_FEATURES_COMMON = ['co2', 'humidity', 'pm25', 'temperature']
-
-AVAILABLE_FEATURES = {
-    MODEL_AIRQUALITYMONITOR_S1: AVAILABLE_FEATURES_COMMON + ['battery', 'battery_state', 'tvoc'],
-    MODEL_AIRQUALITYMONITOR_LITE: AVAILABLE_FEATURES_COMMON + ['battery', 'battery_state', 'pm10'],
-    MODEL_AIRQUALITYMONITOR_LITE_DANY: AVAILABLE_FEATURES_COMMON + 
-        ['battery', 'battery_state', 'voltage', 'pm10'] + 
-        ["monitoring_frequency", "screen_off", "device_off", "screensaver_time", "auto_slideing_time", "screensaver_type", "device_off_new", "is_twelve_hours_sys", "pm_tpf_standard"]
-}
+# same as the core xiaomi_miio integration, which is imported only to connect
+CONF_FLOW_TYPE = "config_flow_device"
+CONF_MANUAL = "manual"
+CONF_CLOUD_USERNAME = "cloud_username"
+CONF_CLOUD_PASSWORD = "cloud_password"
+CONF_CLOUD_COUNTRY = "cloud_country"
+DEFAULT_CLOUD_COUNTRY = "cn"
+SERVER_COUNTRY_CODES = ["cn", "de", "i2", "ru", "sg", "us"]
 
 DEFAULT_SCAN_INTERVAL = 60
 SCAN_INTERVAL = timedelta(seconds=DEFAULT_SCAN_INTERVAL)
+DEFAULT_MAX_AGE = 300
+DEFAULT_HISTORY_RETENTION = 24
+DEFAULT_EXPORT_INTERVAL = 0
+DEFAULT_SMOOTHING_WINDOW = 0
+DEFAULT_STUCK_POLLS = 30
+
+ENTITY_MODE_FULL = "full"
+ENTITY_MODE_TELEMETRY = "telemetry"
+ENTITY_MODE_SNAPSHOT = "snapshot"
+ENTITY_MODES = [ENTITY_MODE_FULL, ENTITY_MODE_TELEMETRY, ENTITY_MODE_SNAPSHOT]
 
 ATTR_POWER = "power"
 ATTR_TEMPERATURE = "temperature"
@@ -90,12 +97,6 @@ ATTR_COUNT_DOWN_TIME = "count_down_time"
 ATTR_COUNT_DOWN = "count_down"
 ATTR_KEEP_RELAY = "keep_relay"
 
-BATTERY_STATE_LITE = {
-    "Charging": 0,
-    "Charging": 1,
-    "Not charging": 2,
-    "Not chargeable": 3
-}
 
 @dataclass
 class XiaomiAirQualitySensorDescription(
@@ -176,6 +177,17 @@ AIRQUALITY_SENSORS: tuple[XiaomiAirQualitySensorDescription, ...] = (
     )
 )
 
+# properties behind the sensors, the only ones polled in the lightweight modes
+TELEMETRY_FEATURES = tuple(description.key for description in AIRQUALITY_SENSORS)
+
+# single sensor of the snapshot mode, with the readings as attributes
+AIRQUALITY_SNAPSHOT_SENSOR = XiaomiAirQualitySensorDescription(
+    key="snapshot",
+    name="Readings",
+    device_class=SensorDeviceClass.TIMESTAMP,
+    icon="mdi:air-filter"
+)
+
 
 @dataclass
 class XiaomiAirQualitySwitchDescription(
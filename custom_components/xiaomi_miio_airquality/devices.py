@@ -0,0 +1,37 @@
+"""Device classes of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+from importlib import import_module
+
+from .models import (
+    MODELS_MIIO,
+    MODELS_MIOT
+)
+
+# protocol module and class of each model, imported on first use
+DEVICE_CLASSES = {
+    **{model: ("airmonitor", "AirQualityMonitor") for model in MODELS_MIIO},
+    **{model: ("airmonitor_miot", "AirQualityMonitorMiot") for model in MODELS_MIOT}
+}
+
+
+def get_device_class(model: str) -> type | None:
+    """Return the device class of a model, importing only its protocol module."""
+    if model not in DEVICE_CLASSES:
+        return None
+    module, name = DEVICE_CLASSES[model]
+    return getattr(import_module(f".{module}", __package__), name)
+
+
+def send_batched(device, command: str, properties: list, max_properties: int = 15) -> list:
+    """Send get_properties or set_properties for many properties, max_properties per request.
+
+    Each property is a dict with siid, piid and, to set it, value. Returns
+    the result of each property, in order, with its code.
+    """
+    results = []
+    for start in range(0, len(properties), max_properties):
+        chunk = [
+            {"did": f"{prop['siid']}-{prop['piid']}", **prop}
+            for prop in properties[start:start + max_properties]
+        ]
+        results.extend(device.send(command, chunk))
+    return results
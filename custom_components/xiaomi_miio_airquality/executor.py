@@ -0,0 +1,119 @@
+"""Device I/O executor of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict
+
+from miio import DeviceException
+
+_LOGGER = logging.getLogger(__name__)
+
+MIN_WORKERS = 2
+MAX_WORKERS = 16
+# calls waiting for a worker, per worker, before polls are shed
+QUEUE_PER_WORKER = 4
+
+
+class DeviceBusy(DeviceException):
+    """The call was shed because the device executor is saturated."""
+
+
+class DeviceExecutor:
+    """Bounded thread pool running the blocking device calls.
+
+    Keeps the miio calls of the component out of the shared executor of
+    Home Assistant, so timing out monitors only hold up each other. The
+    pool grows with the number of devices and does not shrink again, idle
+    workers just wait. Once as many calls are waiting as the queue allows,
+    sheddable calls (polls) fail at once with DeviceBusy instead of
+    queuing, and the cache serves the last status.
+    """
+
+    def __init__(self, devices: int = 1) -> None:
+        self.workers = 0
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.shed = 0
+        self.resize(devices)
+
+    @property
+    def max_queue(self) -> int:
+        """Return the number of calls allowed to wait for a worker."""
+        return self.workers * QUEUE_PER_WORKER
+
+    @property
+    def queued(self) -> int:
+        """Return the number of calls waiting for a worker."""
+        return max(self.pending - self.running, 0)
+
+    @property
+    def saturation(self) -> float:
+        """Return the share of busy workers."""
+        return self.running / self.workers if self.workers else 0.0
+
+    def resize(self, devices: int) -> None:
+        """Grow the pool for a number of devices."""
+        workers = min(MAX_WORKERS, max(MIN_WORKERS, devices))
+        if workers <= self.workers:
+            return
+        self.workers = workers
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(workers, thread_name_prefix="xiaomi_airquality")
+        else:
+            # the pool starts threads on demand up to its maximum
+            self._executor._max_workers = workers  # pylint: disable=protected-access
+        _LOGGER.debug("Device executor grown to %s workers", workers)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the current load of the executor."""
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "saturation": round(self.saturation, 2),
+            "completed": self.completed,
+            "shed": self.shed
+        }
+
+    async def async_run(self, func: Callable, *args, shed: bool = True):
+        """Run func(*args) in the pool.
+
+        With shed, raise DeviceBusy rather than queue the call when the
+        queue is full.
+        """
+        if shed and self.queued >= self.max_queue:
+            self.shed += 1
+            if self.shed == 1 or self.shed % 100 == 0:
+                _LOGGER.warning(
+                    "Device executor saturated (%s calls queued), %s polls skipped so far",
+                    self.queued, self.shed)
+            raise DeviceBusy("Device executor saturated")
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, partial(self._call, func, *args))
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def _call(self, func: Callable, *args):
+        """Run func in a worker, counting it as running."""
+        with self._lock:
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def shutdown(self) -> None:
+        """Stop the pool without waiting for the calls in flight."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
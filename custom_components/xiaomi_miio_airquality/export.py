@@ -0,0 +1,191 @@
+"""Reading export of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import asyncio
+import csv
+import gzip
+import io
+import json
+import logging
+import math
+import os
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, Iterable, Iterator, List, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DATA_KEY,
+    DOMAIN
+)
+from .history import HISTORY_COLUMNS, ReadingHistory
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_CSV = "csv"
+EXPORT_NDJSON = "ndjson"
+EXPORT_FORMATS = [EXPORT_CSV, EXPORT_NDJSON]
+
+EXPORT_DIR = f"{DOMAIN}_exports"
+EXPORT_FIELDS = ("host", "time") + HISTORY_COLUMNS
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.export"
+
+Row = Tuple[Any, ...]
+
+
+def iter_rows(
+    host: str,
+    history: ReadingHistory,
+    start: float,
+    end: float,
+    exclusive: bool = False
+) -> Iterator[Row]:
+    """Yield the export rows of a device history, oldest first.
+
+    With exclusive, the sample at start itself is left out, as it was
+    already exported.
+    """
+    indexes = [history.columns.index(name) for name in HISTORY_COLUMNS]
+    for timestamp, readings in history.samples(start, end):
+        if exclusive and timestamp <= start:
+            continue
+        yield (
+            host,
+            timestamp,
+            *[None if math.isnan(readings[index]) else readings[index] for index in indexes]
+        )
+
+
+def encode_csv(rows: Iterable[Row], header: bool) -> Iterator[str]:
+    """Encode rows as CSV lines."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    for host, timestamp, *readings in rows:
+        writer.writerow([host, _isoformat(timestamp), *readings])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def encode_ndjson(rows: Iterable[Row]) -> Iterator[str]:
+    """Encode rows as newline delimited JSON."""
+    for host, timestamp, *readings in rows:
+        record = {"host": host, "time": _isoformat(timestamp)}
+        record.update(zip(HISTORY_COLUMNS, readings))
+        yield json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def write_export(
+    path: str,
+    export_format: str,
+    sources: List[Tuple[str, ReadingHistory, float, float, bool]]
+) -> Tuple[int, Dict[str, float]]:
+    """Append the readings of the sources to a file, streaming row by row.
+
+    Files ending in .gz are gzip compressed. Returns the number of rows
+    written and the timestamp of the last row of each host.
+    """
+    last: Dict[str, float] = {}
+    count = 0
+
+    def rows() -> Iterator[Row]:
+        nonlocal count
+        for host, history, start, end, exclusive in sources:
+            for row in iter_rows(host, history, start, end, exclusive):
+                count += 1
+                last[host] = row[1]
+                yield row
+
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+    if export_format == EXPORT_CSV:
+        lines = encode_csv(rows(), new_file)
+    else:
+        lines = encode_ndjson(rows())
+
+    export_file: IO[str]
+    if path.endswith(".gz"):
+        export_file = gzip.open(path, "at", encoding="utf-8", newline="")
+    else:
+        export_file = open(path, "a", encoding="utf-8", newline="")  # pylint: disable=consider-using-with
+    with export_file:
+        for line in lines:
+            export_file.write(line)
+    return count, last
+
+
+class ReadingExporter:
+    """Exports buffered readings, remembering what was exported per file and device."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # timestamp of the last row exported incrementally, by file and host
+        self._exported: Dict[str, Dict[str, float]] | None = None
+        self._lock = asyncio.Lock()
+
+    async def async_export(
+        self,
+        hosts: List[str] | None = None,
+        export_format: str = EXPORT_CSV,
+        compress: bool = False,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        incremental: bool = False,
+        filename: str | None = None
+    ) -> Dict[str, Any]:
+        """Export the readings of the hosts (all by default) to a file."""
+        async with self._lock:
+            if self._exported is None:
+                stored = await self._store.async_load() or {}
+                # drop the per host marks saved before they were kept per file
+                self._exported = {
+                    name: marks for name, marks in stored.items() if isinstance(marks, dict)
+                }
+
+            if filename is None:
+                filename = f"readings.{export_format}"
+            filename = os.path.basename(filename)
+            if compress and not filename.endswith(".gz"):
+                filename += ".gz"
+            directory = self._hass.config.path(EXPORT_DIR)
+            path = os.path.join(directory, filename)
+            exported = self._exported.get(filename, {})
+
+            devices = self._hass.data.get(DATA_KEY, {})
+            if hosts is None:
+                hosts = list(devices)
+            sources = []
+            for host in hosts:
+                handle = devices.get(host)
+                cache = handle.cache if handle is not None else None
+                if cache is None or cache.history is None:
+                    _LOGGER.warning("No reading history of %s to export", host)
+                    continue
+                first = start.timestamp() if start else 0
+                exclusive = False
+                if incremental and exported.get(host, -math.inf) >= first:
+                    first = exported[host]
+                    exclusive = True
+                sources.append(
+                    (host, cache.history, first, end.timestamp() if end else math.inf, exclusive))
+
+            def export() -> Tuple[int, Dict[str, float]]:
+                os.makedirs(directory, exist_ok=True)
+                return write_export(path, export_format, sources)
+
+            count, last = await self._hass.async_add_executor_job(export)
+            if incremental and last:
+                marks = self._exported.setdefault(filename, {})
+                for host, timestamp in last.items():
+                    marks[host] = max(marks.get(host, timestamp), timestamp)
+                self._store.async_delay_save(lambda: self._exported, 10)
+            _LOGGER.debug("Exported %s readings to %s", count, path)
+            return {"path": path, "rows": count}
+
+
+def _isoformat(timestamp: float) -> str:
+    """Return a timestamp in ISO 8601."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
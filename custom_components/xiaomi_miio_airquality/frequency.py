@@ -0,0 +1,79 @@
+"""Monitoring frequency sync of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import logging
+import time
+
+from homeassistant.core import HomeAssistant
+from miio import DeviceException
+
+from .cache import AirQualityStatusCache
+
+_LOGGER = logging.getLogger(__name__)
+
+MONITORING_FREQUENCY = "monitoring_frequency"
+
+# range of the monitoring-frequency property, in seconds
+MIN_FREQUENCY = 1
+MAX_FREQUENCY = 600
+# relative difference to the poll interval tolerated before correcting it
+FREQUENCY_TOLERANCE = 0.2
+# seconds after a correction before the next one
+FREQUENCY_HOLD = 600
+# weight of the last interval in the running poll interval
+INTERVAL_WEIGHT = 0.2
+
+
+class MonitoringFrequencySync:
+    """Keeps the sampling interval of a device in step with its polls.
+
+    Used as listener of the status cache: the interval between fetched
+    statuses is averaged, so slower polls (a longer scan interval, shed
+    or failed polls) are followed as well. When the monitoring-frequency
+    reported by the device differs from it by more than the tolerance, it
+    is set to the poll interval, at most once per hold time.
+    """
+
+    def __init__(self, hass: HomeAssistant, cache: AirQualityStatusCache, device) -> None:
+        self._hass = hass
+        self._cache = cache
+        self._device = device
+        self.interval: float | None = None
+        self._previous: float | None = None
+        self._last_set = -FREQUENCY_HOLD
+        self._pending = False
+
+    def __call__(self, timestamp: float, status) -> None:
+        """Take the interval of a fetched status and correct the frequency if needed."""
+        if self._previous is not None and timestamp > self._previous:
+            sample = timestamp - self._previous
+            if self.interval is None:
+                self.interval = sample
+            else:
+                self.interval += INTERVAL_WEIGHT * (sample - self.interval)
+        self._previous = timestamp
+
+        current = getattr(status, MONITORING_FREQUENCY, None)
+        if (
+            current is None
+            or self.interval is None
+            or self._pending
+            or time.monotonic() - self._last_set < FREQUENCY_HOLD
+        ):
+            return
+        target = min(MAX_FREQUENCY, max(MIN_FREQUENCY, round(self.interval)))
+        if abs(target - current) <= FREQUENCY_TOLERANCE * target:
+            return
+        self._pending = True
+        self._hass.async_create_task(self._async_set(current, target))
+
+    async def _async_set(self, current: int, target: int) -> None:
+        """Set the monitoring frequency of the device."""
+        try:
+            await self._cache.async_call(self._device.set_value, MONITORING_FREQUENCY, target)
+            _LOGGER.debug(
+                "Monitoring frequency of %s set from %s to %s seconds",
+                self._device.ip, current, target)
+        except DeviceException as ex:
+            _LOGGER.warning("Setting the monitoring frequency of %s failed: %s", self._device.ip, ex)
+        finally:
+            self._pending = False
+            self._last_set = time.monotonic()
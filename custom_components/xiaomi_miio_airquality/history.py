@@ -0,0 +1,376 @@
+"""Reading history of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_COLUMNS = (
+    "temperature",
+    "humidity",
+    "co2",
+    "pm25",
+    "pm10",
+    "tvoc",
+    "battery"
+)
+
+STATISTICS_WINDOWS = {
+    "1h": 3600,
+    "24h": 86400
+}
+
+STATISTICS_ATTRIBUTES = frozenset(
+    f"{statistic}_{window}"
+    for statistic in ("mean", "min", "max", "p95")
+    for window in STATISTICS_WINDOWS
+)
+
+NAN = float("nan")
+
+# header of the history file: magic, format, column count, capacity, seq,
+# followed by the column names, padded so the data is 8 byte aligned
+HISTORY_MAGIC = b"XAQH"
+HISTORY_FORMAT = 1
+HISTORY_HEADER = struct.Struct("<4sHHIQ")
+HISTORY_SEQ_OFFSET = 12
+HISTORY_COLUMN_NAME = struct.Struct("16s")
+
+
+class RollingWindow:
+    """Running statistics of a history column over a time window.
+
+    Samples enter when appended and leave when they fall out of the
+    window. Besides the running sum, the values are kept in a sorted list,
+    so each update costs two binary searches and the min, max and
+    percentiles are read without sorting the window.
+    """
+
+    __slots__ = ("window", "start", "total", "count", "_sorted")
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self.start = 0
+        self.total = 0.0
+        self.count = 0
+        self._sorted: list[float] = []
+
+    def add(self, seq: int, value: float) -> None:
+        """Add the sample with sequence number seq."""
+        if value != value:
+            return
+        self.total += value
+        self.count += 1
+        insort(self._sorted, value)
+
+    def evict(self, column, timestamps, end: int, limit: int, cutoff: float) -> None:
+        """Drop the samples before seq limit or older than cutoff."""
+        capacity = len(timestamps)
+        start = self.start
+        while start < end and (start < limit or timestamps[start % capacity] < cutoff):
+            value = column[start % capacity]
+            if value == value:
+                self.total -= value
+                self.count -= 1
+                del self._sorted[bisect_left(self._sorted, value)]
+            start += 1
+        self.start = start
+        if not self.count:
+            self.total = 0.0
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the window."""
+        return self.total / self.count if self.count else None
+
+    @property
+    def minimum(self) -> float | None:
+        """Return the minimum of the window."""
+        return self._sorted[0] if self._sorted else None
+
+    @property
+    def maximum(self) -> float | None:
+        """Return the maximum of the window."""
+        return self._sorted[-1] if self._sorted else None
+
+    def percentile(self, q: float) -> float | None:
+        """Return the q-th percentile of the window."""
+        return percentile(self._sorted, q)
+
+
+class ReadingHistory:
+    """Ring buffer of the recent readings of a device.
+
+    Timestamps and readings are kept column-major in one preallocated
+    block of doubles; missing readings are NaN. The capacity follows from
+    the retention window and the poll interval.
+
+    With a path the block is a memory-mapped file, written in place on
+    every append, so the history survives restarts. Opening it costs the
+    same whatever its length; the rolling windows are rebuilt from the
+    samples they cover by load_windows, or on first use. A file written
+    with another capacity, after a change of the retention or the poll
+    interval, is resized keeping its most recent samples.
+
+    Once closed, appends are dropped and samples yields nothing more, so
+    a refresh or an export still in flight does not touch the unmapped
+    file.
+    """
+
+    def __init__(
+        self,
+        retention: float,
+        interval: float,
+        columns: Sequence[str] = HISTORY_COLUMNS,
+        path: str | None = None
+    ) -> None:
+        self.retention = retention
+        self.columns = tuple(columns)
+        self.capacity = max(2, math.ceil(retention / max(interval, 1)) + 1)
+        self.seq = 0
+        self.closed = False
+        self._file = None
+        self._mmap = None
+        if path is None:
+            self._data = array("d", [NAN]) * ((len(self.columns) + 1) * self.capacity)
+            self._bind(memoryview(self._data))
+        else:
+            self._bind(self._map(path))
+        self._windows = {
+            name: [RollingWindow(window) for _ in self.columns]
+            for name, window in STATISTICS_WINDOWS.items()
+            if window <= retention
+        }
+        self._windows_loaded = self.seq == 0
+
+    @property
+    def header_size(self) -> int:
+        """Return the size of the file header, a multiple of 8."""
+        size = HISTORY_HEADER.size + HISTORY_COLUMN_NAME.size * len(self.columns)
+        return (size + 7) // 8 * 8
+
+    def _header(self) -> bytes:
+        """Return the file header for the current seq."""
+        header = HISTORY_HEADER.pack(
+            HISTORY_MAGIC, HISTORY_FORMAT, len(self.columns), self.capacity, self.seq)
+        for name in self.columns:
+            header += HISTORY_COLUMN_NAME.pack(name.encode())
+        return header.ljust(self.header_size, b"\0")
+
+    def _map(self, path: str) -> memoryview:
+        """Map the history file, creating it when missing or not matching."""
+        data_size = (len(self.columns) + 1) * self.capacity * 8
+        expected = self._header()
+        try:
+            history_file = open(path, "r+b")  # pylint: disable=consider-using-with
+        except FileNotFoundError:
+            history_file = open(path, "w+b")  # pylint: disable=consider-using-with
+
+        header = history_file.read(self.header_size)
+        seq_end = HISTORY_SEQ_OFFSET + 8
+        if (
+            header[:HISTORY_SEQ_OFFSET] != expected[:HISTORY_SEQ_OFFSET]
+            or header[seq_end:] != expected[seq_end:]
+            or os.fstat(history_file.fileno()).st_size != self.header_size + data_size
+        ):
+            data = array("d", [NAN]) * (data_size // 8)
+            if self._resizable(history_file, header):
+                self._resize(history_file, header, data, path)
+            elif header:
+                _LOGGER.warning("Discarding history %s written with other columns", path)
+            history_file.seek(0)
+            history_file.truncate()
+            history_file.write(self._header())
+            history_file.write(data.tobytes())
+            history_file.flush()
+        else:
+            self.seq = HISTORY_HEADER.unpack_from(header)[4]
+
+        self._file = history_file
+        self._mmap = mmap.mmap(history_file.fileno(), 0)
+        return memoryview(self._mmap)[self.header_size:].cast("d")
+
+    def _resizable(self, history_file, header: bytes) -> bool:
+        """Return whether a file header differs from ours in the capacity only."""
+        if len(header) != self.header_size:
+            return False
+        magic, version, count, capacity, _ = HISTORY_HEADER.unpack_from(header)
+        return (
+            (magic, version, count) == (HISTORY_MAGIC, HISTORY_FORMAT, len(self.columns))
+            and header[HISTORY_HEADER.size:] == self._header()[HISTORY_HEADER.size:]
+            and os.fstat(history_file.fileno()).st_size
+            == self.header_size + (count + 1) * capacity * 8
+        )
+
+    def _resize(self, history_file, header: bytes, data: array, path: str) -> None:
+        """Copy the most recent samples of a file with another capacity into data."""
+        _, _, _, capacity, seq = HISTORY_HEADER.unpack_from(header)
+        old = array("d")
+        old.frombytes(history_file.read((len(self.columns) + 1) * capacity * 8))
+        kept = range(max(0, seq - capacity, seq - self.capacity), seq)
+        for new_seq, old_seq in enumerate(kept):
+            slot = old_seq % capacity
+            for column in range(len(self.columns) + 1):
+                data[column * self.capacity + new_seq] = old[column * capacity + slot]
+        self.seq = len(kept)
+        _LOGGER.info(
+            "Resized history %s from %d to %d samples, keeping %d",
+            path, capacity, self.capacity, self.seq)
+
+    def close(self) -> None:
+        """Stop appending, then flush and unmap the history file."""
+        self.closed = True
+        if self._mmap is None:
+            return
+        self._timestamps.release()
+        for column in self._columns:
+            column.release()
+        self._view.release()
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+        self._mmap = None
+        self._file = None
+
+    def load_windows(self, now: float | None = None) -> None:
+        """Rebuild the rolling windows from the stored samples, once."""
+        if not self._windows_loaded:
+            self._load_windows(time.time() if now is None else now)
+
+    def _first_after(self, first: int, cutoff: float) -> int:
+        """Return the first seq from first on not older than cutoff."""
+        timestamps = self._timestamps
+        capacity = self.capacity
+        low, high = first, self.seq
+        while low < high:
+            middle = (low + high) // 2
+            if timestamps[middle % capacity] < cutoff:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _load_windows(self, now: float) -> None:
+        """Rebuild the rolling windows from the samples within them."""
+        first = max(0, self.seq - self.capacity)
+        for windows in self._windows.values():
+            start = self._first_after(first, now - windows[0].window)
+            for index, window in enumerate(windows):
+                window.start = start
+                column = self._columns[index]
+                for seq in range(start, self.seq):
+                    window.add(seq, column[seq % self.capacity])
+        self._windows_loaded = True
+        self._evict(now, first)
+
+    def _bind(self, view: memoryview) -> None:
+        """Slice the storage into the timestamp and reading columns."""
+        capacity = self.capacity
+        self._view = view
+        self._timestamps = view[:capacity]
+        self._columns = [
+            view[(index + 1) * capacity:(index + 2) * capacity]
+            for index in range(len(self.columns))
+        ]
+
+    def __len__(self) -> int:
+        return min(self.seq, self.capacity)
+
+    def append(self, timestamp: float, status) -> None:
+        """Store the readings of a status fetched at timestamp."""
+        if self.closed:
+            return
+        if not self._windows_loaded:
+            self._load_windows(timestamp)
+        seq = self.seq
+        capacity = self.capacity
+        slot = seq % capacity
+        self._evict(timestamp, seq + 1 - capacity)
+
+        # readers skip the slot while its timestamp is NaN
+        self._timestamps[slot] = NAN
+        for index, name in enumerate(self.columns):
+            value = getattr(status, name, None)
+            if value is None or isinstance(value, str):
+                value = NAN
+            self._columns[index][slot] = value
+            for windows in self._windows.values():
+                windows[index].add(seq, value)
+        self._timestamps[slot] = timestamp
+        self.seq = seq + 1
+        if self._mmap is not None:
+            struct.pack_into("<Q", self._mmap, HISTORY_SEQ_OFFSET, self.seq)
+
+    def _evict(self, now: float, limit: int) -> None:
+        """Move the windows past samples being overwritten or too old."""
+        timestamps = self._timestamps
+        for windows in self._windows.values():
+            cutoff = now - windows[0].window
+            for index, window in enumerate(windows):
+                window.evict(self._columns[index], timestamps, self.seq, limit, cutoff)
+
+    def statistics(self, column: str, now: float | None = None) -> Dict[str, float | None]:
+        """Return the rolling mean, min, max and 95th percentile of a column."""
+        if now is None:
+            now = time.time()
+        if not self._windows_loaded:
+            self._load_windows(now)
+        self._evict(now, self.seq - self.capacity)
+        index = self.columns.index(column)
+        stats = {}
+        for name, windows in self._windows.items():
+            window = windows[index]
+            stats[f"mean_{name}"] = _round(window.mean)
+            stats[f"min_{name}"] = _round(window.minimum)
+            stats[f"max_{name}"] = _round(window.maximum)
+            stats[f"p95_{name}"] = _round(window.percentile(95))
+        return stats
+
+    def samples(self, start: float = 0, end: float = math.inf) -> Iterator[Tuple[float, List[float]]]:
+        """Yield (timestamp, readings) between start and end, oldest first.
+
+        Safe to consume from another thread than the writer, with the
+        slot timestamps as a seqlock: append sets the timestamp of a slot
+        to NaN while writing it, so a sample is only yielded when its
+        timestamp is the same before and after its readings were copied.
+        Samples overwritten while being read are skipped.
+        """
+        capacity = self.capacity
+        timestamps = self._timestamps
+        columns = self._columns
+        for seq in range(max(0, self.seq - capacity), self.seq):
+            slot = seq % capacity
+            try:
+                timestamp = timestamps[slot]
+                if not start <= timestamp <= end:
+                    continue
+                readings = [column[slot] for column in columns]
+                unchanged = timestamps[slot] == timestamp
+            except ValueError:
+                # the views were released by close meanwhile
+                if self.closed:
+                    return
+                raise
+            if unchanged:
+                yield timestamp, readings
+
+
+def percentile(values: Sequence[float], q: float) -> float | None:
+    """Return the q-th percentile of sorted values, interpolating linearly."""
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _round(value: float | None) -> float | None:
+    """Round a statistic for display."""
+    return None if value is None else round(value, 2)
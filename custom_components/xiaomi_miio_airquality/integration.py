@@ -0,0 +1,272 @@
+"""Setup of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+# pylint: disable=import-error
+import logging
+import os
+from datetime import timedelta
+from functools import partial
+
+from homeassistant.const import (
+    CONF_HOST,
+    CONF_SCAN_INTERVAL,
+    CONF_TOKEN,
+    EVENT_HOMEASSISTANT_STOP
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import PlatformNotReady
+from homeassistant.helpers.event import async_track_time_interval
+from miio import (  # pylint: disable=import-error
+    Device,
+    DeviceException
+)
+
+from .anomaly import EVENT_ANOMALY, AnomalyDetector
+from .cache import AirQualityStatusCache
+from .history import HISTORY_COLUMNS, ReadingHistory
+
+from .const import (
+    AVAILABLE_FEATURES,
+    CONF_ANOMALY_DETECTION,
+    CONF_ENTITY_MODE,
+    CONF_EXPORT_FORMAT,
+    CONF_EXPORT_INTERVAL,
+    CONF_HISTORY_RETENTION,
+    CONF_MAX_AGE,
+    CONF_MODEL,
+    CONF_STUCK_POLLS,
+    CONF_SYNC_FREQUENCY,
+    CONF_ZONE,
+    DEFAULT_EXPORT_INTERVAL,
+    DEFAULT_HISTORY_RETENTION,
+    DEFAULT_MAX_AGE,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STUCK_POLLS,
+    DATA_EXPORTER,
+    DATA_KEY,
+    DATA_ZONES,
+    DOMAIN,
+    DOMAINS,
+    ENTITY_MODE_FULL,
+    MODELS_MIOT,
+    TELEMETRY_FEATURES
+)
+from .devices import get_device_class
+from .export import EXPORT_CSV, ReadingExporter
+from .frequency import MONITORING_FREQUENCY, MonitoringFrequencySync
+from .manager import DeviceHandle, DeviceManager
+from .metrics import AirQualityMetricsView
+from .recovery import AddressRecovery
+from .services import async_setup_services
+from .transport import use_shared_transport
+from .zones import Zone
+
+_LOGGER = logging.getLogger(__name__)
+
+async def async_setup(hass: HomeAssistant, hass_config: dict):
+    """Set up the Xiaomi Mi/QingPing Air Quality Monitor Component."""
+    manager = hass.data[DATA_KEY] = DeviceManager(hass)
+
+    async def async_stop(event):
+        """Close the devices still in use when Home Assistant stops."""
+        await manager.async_close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop)
+    hass.data[DATA_EXPORTER] = ReadingExporter(hass)
+    hass.http.register_view(AirQualityMetricsView(manager))
+    await async_setup_services(hass)
+
+    return True
+
+
+def history_path(hass: HomeAssistant, entry_id: str) -> str:
+    """Return the path of the reading history file of an entry."""
+    return hass.config.path(".storage", f"{DOMAIN}.{entry_id}.history")
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Delete the reading history of a removed entry."""
+    path = history_path(hass, entry.entry_id)
+    try:
+        await hass.async_add_executor_job(os.remove, path)
+    except FileNotFoundError:
+        pass
+    except OSError as ex:
+        _LOGGER.warning("Unable to delete the reading history %s: %s", path, ex)
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry):
+    """ Update Optioins if available """
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """ check unload integration """
+    unload_ok = all([
+        await hass.config_entries.async_forward_entry_unload(entry, domain)
+        for domain in DOMAINS
+    ])
+    return unload_ok
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Support Xiaomi Mi/QingPing Air Quality Monitor Component."""
+    # pylint: disable=too-many-statements, too-many-locals
+    # migrate data (also after first setup) to options
+    if entry.data:
+        hass.config_entries.async_update_entry(entry, data={},
+                                               options=entry.data)
+
+    # add update handler
+    if not entry.update_listeners:
+        entry.add_update_listener(async_update_options)
+
+    if entry.data.get(CONF_HOST, None):
+        host = entry.data[CONF_HOST]
+        token = entry.data[CONF_TOKEN]
+        model = entry.data.get(CONF_MODEL)
+    else:
+        host = entry.options[CONF_HOST]
+        token = entry.options[CONF_TOKEN]
+        model = entry.options.get(CONF_MODEL)
+
+    if model is None:
+        try:
+            miio_device = Device(host, token)
+            device_info = await hass.async_add_executor_job(miio_device.info)
+            model = device_info.model
+            _LOGGER.info(
+                "%s %s %s detected",
+                model,
+                device_info.firmware_version,
+                device_info.hardware_version,
+            )
+        except DeviceException as ex:
+            raise PlatformNotReady from ex
+
+    # only the protocol module of the configured model is imported
+    device_class = await hass.async_add_executor_job(get_device_class, model)
+    if device_class is None:
+        _LOGGER.error(
+            "Unsupported device found! Please create an issue at "
+            "https://github.com/rytilahti/python-miio/issues "
+            "and provide the following data: %s",
+            model,
+        )
+        return False
+
+    scan_interval = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    manager: DeviceManager = hass.data[DATA_KEY]
+
+    async def async_create_device() -> DeviceHandle:
+        """Create the client, history and status cache of the device."""
+        attributes = None
+        if entry.options.get(CONF_ENTITY_MODE, ENTITY_MODE_FULL) != ENTITY_MODE_FULL:
+            # poll the readings only, the settings have no entities
+            attributes = list(TELEMETRY_FEATURES)
+        if entry.options.get(CONF_SYNC_FREQUENCY, False) and model in MODELS_MIOT:
+            # the sync needs the current frequency of the device in its status
+            if attributes is None:
+                attributes = list(AVAILABLE_FEATURES.get(model, []))
+            if MONITORING_FREQUENCY not in attributes:
+                attributes.append(MONITORING_FREQUENCY)
+        airquality = device_class(host, token, model=model, attributes=attributes)
+        protocol = use_shared_transport(airquality, manager.transport)
+        await manager.sessions.async_load()
+        if protocol is not None:
+            manager.sessions.restore(host, protocol)
+        retention = entry.options.get(CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION)
+        history = None
+        if retention:
+            history = await hass.async_add_executor_job(
+                ReadingHistory,
+                retention * 3600,
+                scan_interval,
+                HISTORY_COLUMNS,
+                history_path(hass, entry.entry_id)
+            )
+            # rebuild the statistics off the event loop
+            await hass.async_add_executor_job(history.load_windows)
+        handle = DeviceHandle(host, airquality, AirQualityStatusCache(
+            hass,
+            airquality,
+            scan_interval,
+            entry.options.get(CONF_MAX_AGE, DEFAULT_MAX_AGE),
+            history,
+            manager.executor
+        ))
+        if history is not None:
+
+            async def async_close_history():
+                """Drop the appends of refreshes still in flight, then unmap the file."""
+                history.closed = True
+                await hass.async_add_executor_job(history.close)
+
+            handle.async_on_release(async_close_history)
+        if protocol is not None:
+            handle.cache.add_listener(
+                lambda timestamp, status: manager.sessions.remember(host, protocol))
+        handle.cache.add_error_listener(
+            AddressRecovery(hass, entry, manager))
+        return handle
+
+    handle = await manager.async_acquire(host, entry.entry_id, async_create_device)
+    entry.async_on_unload(partial(manager.release, host, entry.entry_id))
+    cache = handle.cache
+    history = cache.history
+
+    zone_name = entry.options.get(CONF_ZONE, "").strip()
+    if zone_name:
+        zones = hass.data.setdefault(DATA_ZONES, {})
+        zone = zones.setdefault(zone_name, Zone(zone_name))
+        zone.members.add(host)
+        remove_listener = cache.add_listener(
+            lambda timestamp, status: zone.update(host, status))
+
+        def leave_zone():
+            """Remove the device from its zone."""
+            remove_listener()
+            zone.remove(host)
+            zone.release(entry.entry_id)
+            if not zone.members:
+                zones.pop(zone_name, None)
+
+        entry.async_on_unload(leave_zone)
+
+    if entry.options.get(CONF_ANOMALY_DETECTION, False):
+        detector = AnomalyDetector(
+            entry.options.get(CONF_STUCK_POLLS, DEFAULT_STUCK_POLLS))
+
+        def detect_anomalies(timestamp, status):
+            """Fire an event for each anomaly starting in a status."""
+            for anomaly in detector.update(timestamp, status):
+                _LOGGER.debug("Anomaly on %s: %s", host, anomaly)
+                hass.bus.async_fire(EVENT_ANOMALY, {"host": host, **anomaly})
+
+        entry.async_on_unload(cache.add_listener(detect_anomalies))
+
+    if entry.options.get(CONF_SYNC_FREQUENCY, False) and model in MODELS_MIOT:
+        entry.async_on_unload(cache.add_listener(
+            MonitoringFrequencySync(hass, cache, handle.device)))
+
+    export_interval = entry.options.get(CONF_EXPORT_INTERVAL, DEFAULT_EXPORT_INTERVAL)
+    if history is not None and export_interval:
+        export_format = entry.options.get(CONF_EXPORT_FORMAT, EXPORT_CSV)
+
+        async def async_export(now):
+            """Append the new readings to the export file of the device."""
+            await hass.data[DATA_EXPORTER].async_export(
+                hosts=[host],
+                export_format=export_format,
+                incremental=True,
+                filename=f"readings-{host}.{export_format}"
+            )
+
+        entry.async_on_unload(async_track_time_interval(
+            hass, async_export, timedelta(minutes=export_interval)))
+
+    # init setup for each supported domains
+    for platform in DOMAINS:
+        hass.async_create_task(hass.config_entries.async_forward_entry_setup(
+            entry, platform))
+
+    return True
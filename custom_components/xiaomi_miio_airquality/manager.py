@@ -0,0 +1,153 @@
+"""Device manager of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import asyncio
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterator
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .cache import AirQualityStatusCache
+from .executor import DeviceExecutor
+from .session import SessionStore
+from .transport import SharedTransport
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DeviceHandle:
+    """A device client and its status cache, shared by everything using its host."""
+
+    def __init__(self, host: str, device, cache: AirQualityStatusCache) -> None:
+        self.host = host
+        self.device = device
+        self.cache = cache
+        self.users: set[str] = set()
+        self._on_release: list[Callable[[], Any]] = []
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the cached readings of the device and its health."""
+        cache = self.cache
+        entry = cache.entry
+        age = cache.age
+        return {
+            "available": cache.get() is not None,
+            "timestamp": dt_util.utc_from_timestamp(entry.timestamp).isoformat() if entry else None,
+            "readings": entry.status.data if entry else {},
+            "health": {
+                "age": round(age, 1) if age is not None else None,
+                "stale": age is None or age > cache.refresh_interval,
+                "failures": cache.failures,
+                "last_error": str(cache.last_error) if cache.last_error else None
+            }
+        }
+
+    def async_on_release(self, func: Callable[[], Any]) -> None:
+        """Call func (which may return an awaitable) when the last user releases the device."""
+        self._on_release.append(func)
+
+    async def async_close(self) -> None:
+        """Release the resources of the device, last registered first."""
+        self.cache.close()
+        while self._on_release:
+            func = self._on_release.pop()
+            try:
+                result = func()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error releasing %s", self.host)
+
+
+class DeviceManager:
+    """Reference-counted device handles by host.
+
+    The first user of a host creates its handle, the others share it. The
+    handle is closed when its last user releases it; creating it again
+    waits for that to finish, so a reload never has two clients (or two
+    history files) open for one host.
+
+    The blocking calls of all devices run in one DeviceExecutor, grown
+    with the number of devices in use, and go out through one
+    SharedTransport. Their sessions are kept in a SessionStore.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._handles: Dict[str, DeviceHandle] = {}
+        self._closing: Dict[str, asyncio.Task] = {}
+        self._lock = asyncio.Lock()
+        self.executor = DeviceExecutor()
+        self.transport = SharedTransport()
+        self.sessions = SessionStore(hass)
+
+    def __contains__(self, host: str) -> bool:
+        return host in self._handles
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._handles))
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    async def async_close(self) -> None:
+        """Close all handles and save the sessions, then stop the executor and socket."""
+        handles = list(self._handles.values())
+        self._handles.clear()
+        await asyncio.gather(
+            *[handle.async_close() for handle in handles],
+            *self._closing.values()
+        )
+        await self.sessions.async_save()
+        self.executor.shutdown()
+        self.transport.close()
+
+    def get(self, host: str) -> DeviceHandle | None:
+        """Return the handle of a host, if it is in use."""
+        return self._handles.get(host)
+
+    async def async_acquire(
+        self,
+        host: str,
+        user: str,
+        factory: Callable[[], Awaitable[DeviceHandle]]
+    ) -> DeviceHandle:
+        """Return the handle of a host for user, creating it with factory if needed."""
+        async with self._lock:
+            handle = self._handles.get(host)
+            if handle is None:
+                closing = self._closing.get(host)
+                if closing is not None:
+                    await closing
+                handle = await factory()
+                self._handles[host] = handle
+                self.executor.resize(len(self._handles))
+            handle.users.add(user)
+            return handle
+
+    def acquire(self, host: str, user: str) -> DeviceHandle:
+        """Add a user to the handle of a host in use."""
+        handle = self._handles[host]
+        handle.users.add(user)
+        return handle
+
+    def release(self, host: str, user: str) -> None:
+        """Remove a user of a host, closing its handle after the last one.
+
+        Registered as an unload callback, so it returns nothing: Home
+        Assistant schedules any value such a callback returns as a task.
+        The handle is closed in a task of its own, which acquiring the host
+        again waits for.
+        """
+        handle = self._handles.get(host)
+        if handle is None:
+            return
+        handle.users.discard(user)
+        if handle.users:
+            return
+        del self._handles[host]
+        task = self._hass.async_create_task(handle.async_close())
+        self._closing[host] = task
+        task.add_done_callback(
+            lambda _: self._closing.pop(host, None) if self._closing.get(host) is task else None)
+        _LOGGER.debug("Releasing %s", host)
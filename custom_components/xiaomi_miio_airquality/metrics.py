@@ -0,0 +1,139 @@
+"""OpenMetrics endpoint of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import math
+import re
+from typing import Iterable, List, Tuple
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+
+from .const import DOMAIN
+from .manager import DeviceManager
+
+PREFIX = "xiaomi_airquality"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# name, type, help of the metrics of each device, from its status cache
+DEVICE_METRICS = (
+    ("up", "gauge", "Whether a status within max age is cached."),
+    ("last_fetch_timestamp_seconds", "gauge", "Time the cached status was fetched."),
+    ("cache_age_seconds", "gauge", "Age of the cached status."),
+    ("consecutive_failures", "gauge", "Polls failed in a row."),
+    ("polls", "counter", "Polls of the device."),
+    ("poll_errors", "counter", "Polls of the device that failed."),
+    ("polls_shed", "counter", "Polls of the device shed by the saturated executor."),
+    ("poll_duration_seconds", "summary", "Time spent polling the device.")
+)
+
+# name, type, help of the metrics of the device executor
+EXECUTOR_METRICS = (
+    ("workers", "gauge", "Threads of the device executor."),
+    ("running", "gauge", "Device calls running."),
+    ("queued", "gauge", "Device calls waiting for a thread."),
+    ("max_queue", "gauge", "Queued calls before polls are shed."),
+    ("saturation", "gauge", "Share of the workers busy."),
+    ("completed", "counter", "Device calls completed."),
+    ("shed", "counter", "Polls shed because the queue was full.")
+)
+
+Sample = Tuple[str, str, float]
+
+
+def _escape(value: str) -> str:
+    """Return a label value escaped for the exposition format."""
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    """Return a sample value in the exposition format."""
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _family(lines: List[str], name: str, kind: str, description: str, samples: Iterable[Sample]) -> None:
+    """Append a metric family with its samples, given as (suffix, labels, value)."""
+    name = f"{PREFIX}_{name}"
+    lines.append(f"# TYPE {name} {kind}")
+    lines.append(f"# HELP {name} {description}")
+    for suffix, labels, value in samples:
+        value = _number(value)
+        lines.append(f"{name}{suffix}{{{labels}}} {value}" if labels else f"{name}{suffix} {value}")
+
+
+def render_metrics(manager: DeviceManager) -> str:
+    """Return the readings and metrics of all devices in OpenMetrics text format.
+
+    Everything is read from the status caches and the executor, no device
+    is polled and no entity state is looked at.
+    """
+    devices = []
+    readings = {}
+    for host in manager:
+        handle = manager.get(host)
+        if handle is None:
+            continue
+        labels = f'host="{_escape(host)}"'
+        cache = handle.cache
+        devices.append((labels, cache))
+        entry = cache.entry
+        if entry is None or cache.get() is None:
+            continue
+        for key, value in entry.status.data.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                readings.setdefault(key, []).append(("", labels, float(value)))
+
+    lines: List[str] = []
+    for key, samples in sorted(readings.items()):
+        _family(lines, re.sub(r"[^a-zA-Z0-9_]", "_", key), "gauge", f"Reading {key}.", samples)
+
+    for name, kind, description in DEVICE_METRICS:
+        samples = []
+        for labels, cache in devices:
+            entry = cache.entry
+            if name == "up":
+                samples.append(("", labels, 1.0 if cache.get() is not None else 0.0))
+            elif name == "last_fetch_timestamp_seconds" and entry is not None:
+                samples.append(("", labels, entry.timestamp))
+            elif name == "cache_age_seconds" and entry is not None:
+                samples.append(("", labels, round(cache.age, 3)))
+            elif name == "consecutive_failures":
+                samples.append(("", labels, float(cache.failures)))
+            elif name == "polls":
+                samples.append(("_total", labels, float(cache.polls)))
+            elif name == "poll_errors":
+                samples.append(("_total", labels, float(cache.errors)))
+            elif name == "polls_shed":
+                samples.append(("_total", labels, float(cache.shed)))
+            elif name == "poll_duration_seconds":
+                samples.append(("_count", labels, float(cache.polls)))
+                samples.append(("_sum", labels, round(cache.poll_seconds, 6)))
+        _family(lines, name, kind, description, samples)
+
+    executor = manager.executor.metrics()
+    for name, kind, description in EXECUTOR_METRICS:
+        _family(
+            lines, f"executor_{name}", kind, description,
+            [("_total" if kind == "counter" else "", "", float(executor[name]))])
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class AirQualityMetricsView(HomeAssistantView):
+    """Serve the readings and metrics of all monitors for scrapers."""
+
+    url = f"/api/{DOMAIN}/metrics"
+    name = f"api:{DOMAIN}:metrics"
+    requires_auth = True
+
+    def __init__(self, manager: DeviceManager) -> None:
+        self._manager = manager
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the metrics in OpenMetrics text format."""
+        return web.Response(
+            body=render_metrics(self._manager).encode("utf-8"),
+            headers={"Content-Type": CONTENT_TYPE}
+        )
@@ -0,0 +1,53 @@
+"""Device models of the Xiaomi Mi/QingPing Air Quality Monitor component.
+
+Kept free of Home Assistant imports, so the device classes and the
+command line tools work without it.
+"""
+
+DOMAIN = "xiaomi_miio_airquality"
+
+MODEL_AIRQUALITYMONITOR_S1 = "cgllc.airmonitor.s1"
+
+MODEL_AIRQUALITYMONITOR_LITE = "cgllc.airm.cgdn1"
+MODEL_AIRQUALITYMONITOR_LITE_DANY = "cgllc.airm.cgd1st"
+
+
+OPT_MODEL = {
+    MODEL_AIRQUALITYMONITOR_S1: "QingPing Air Quality Monitor",
+    MODEL_AIRQUALITYMONITOR_LITE: "QingPing Air Quality Monitor Lite",
+    MODEL_AIRQUALITYMONITOR_LITE_DANY: "QingPing Air Quality Monitor Lite (Dany ESP32)"
+}
+
+
+MODELS_MIIO = [
+    MODEL_AIRQUALITYMONITOR_S1
+]
+
+MODELS_MIIO_W_SWITCH = [
+    MODEL_AIRQUALITYMONITOR_LITE,
+    MODEL_AIRQUALITYMONITOR_LITE_DANY
+]
+
+MODELS_MIOT = [
+    MODEL_AIRQUALITYMONITOR_LITE,
+    MODEL_AIRQUALITYMONITOR_LITE_DANY
+]
+
+MODELS_ALL_DEVICES = MODELS_MIIO + MODELS_MIOT
+
+AVAILABLE_FEATURES_COMMON = ['co2', 'humidity', 'pm25', 'temperature']
+
+AVAILABLE_FEATURES = {
+    MODEL_AIRQUALITYMONITOR_S1: AVAILABLE_FEATURES_COMMON + ['battery', 'battery_state', 'tvoc'],
+    MODEL_AIRQUALITYMONITOR_LITE: AVAILABLE_FEATURES_COMMON + ['battery', 'battery_state', 'pm10'],
+    MODEL_AIRQUALITYMONITOR_LITE_DANY: AVAILABLE_FEATURES_COMMON + 
+        ['battery', 'battery_state', 'voltage', 'pm10'] + 
+        ["monitoring_frequency", "screen_off", "device_off", "screensaver_time", "auto_slideing_time", "screensaver_type", "device_off_new", "is_twelve_hours_sys", "pm_tpf_standard"]
+}
+
+BATTERY_STATE_LITE = {
+    0: "Charging",
+    1: "Charging",
+    2: "Not charging",
+    3: "Not chargeable"
+}
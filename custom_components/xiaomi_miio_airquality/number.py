@@ -15,9 +15,11 @@ from homeassistant.const import (
 from miio import DeviceException
 
 from .const import (
+    CONF_ENTITY_MODE,
     CONF_MODEL,
     DATA_KEY,
     DOMAIN,
+    ENTITY_MODE_FULL,
     AIRQUALITY_NUMBERS,
     MODELS_MIOT,
     AVAILABLE_FEATURES,
@@ -38,7 +40,15 @@ async def async_setup_entry(
     name = entry.title
     unique_id = entry.unique_id
 
-    airquality = hass.data[DOMAIN][host]
+    if entry.options.get(CONF_ENTITY_MODE, ENTITY_MODE_FULL) != ENTITY_MODE_FULL:
+        # the lightweight modes expose the readings only
+        return
+
+    # hold the device until the entry is unloaded
+    handle = hass.data[DATA_KEY].acquire(host, f"{entry.entry_id}.number")
+    entry.async_on_unload(partial(hass.data[DATA_KEY].release, host, f"{entry.entry_id}.number"))
+    airquality = handle.device
+    cache = handle.cache
 
     try:
         entities = []
@@ -50,11 +60,11 @@ async def async_setup_entry(
                     for feature in features:
                         if feature == description.key:
                             entities.extend(
-                                [XiaomiAirQualityNumber(entry.options, description, name, unique_id, airquality)]
+                                [XiaomiAirQualityNumber(entry.options, description, name, unique_id, airquality, cache)]
                             )
                 else:
                     entities.extend(
-                        [XiaomiAirQualityNumber(entry.options, description, name, unique_id, airquality)]
+                        [XiaomiAirQualityNumber(entry.options, description, name, unique_id, airquality, cache)]
                     )
 
         async_add_entities(entities)
@@ -65,7 +75,7 @@ class XiaomiAirQualityNumber(NumberEntity):
     """Implementation of a Xiaomi Mi/QingPing Air Quality Monitor Number."""
     entity_description: XiaomiAirQualityNumberDescription
 
-    def __init__(self, entry_data, description, name, unique_id, airquality):
+    def __init__(self, entry_data, description, name, unique_id, airquality, cache):
         self.entity_description = description
         self._entry_data = entry_data
         self._name = name
@@ -75,6 +85,7 @@ class XiaomiAirQualityNumber(NumberEntity):
         self._mac = entry_data[CONF_TOKEN]
         self._host = entry_data[CONF_HOST]
         self._airquality = airquality
+        self._cache = cache
         self._available = True
         self._skip_update = False
         self._state = None
@@ -113,6 +124,11 @@ class XiaomiAirQualityNumber(NumberEntity):
 
         return device_info
 
+    @property
+    def available(self) -> bool:
+        """Return true when state is known."""
+        return self._available
+
     @property
     def native_value(self):
         """Return the state of the Number."""
@@ -121,7 +137,7 @@ class XiaomiAirQualityNumber(NumberEntity):
     async def _try_command(self, mask_error, func, *args, **kwargs):
         """Call a airquality command handling error messages."""
         try:
-            result = await self.hass.async_add_executor_job(
+            result = await self._cache.async_call(
                 partial(func, *args, **kwargs)
             )
 
@@ -162,10 +178,7 @@ class XiaomiAirQualityNumber(NumberEntity):
             return
 
         try:
-            if self.hass.data[DATA_KEY][self._host].get("status", None):
-                state = self.hass.data[DATA_KEY][self._host]["status"]
-            else:
-                state = await self.hass.async_add_executor_job(self._airquality.status)
+            state = await self._cache.async_get()
             _LOGGER.debug("Got new state: %s", state)
 
             self._available = True
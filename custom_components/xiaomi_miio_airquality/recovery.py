@@ -0,0 +1,90 @@
+"""Address change recovery of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import logging
+import time
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_TOKEN
+from homeassistant.core import HomeAssistant
+from miio import Device, DeviceException
+
+from .const import CONF_MAC, DOMAIN
+from .executor import DeviceBusy
+from .manager import DeviceManager
+from .transport import use_shared_transport
+
+_LOGGER = logging.getLogger(__name__)
+
+# refreshes failed in a row before looking for the device elsewhere
+RECOVERY_FAILURES = 3
+# seconds between two searches for the same device
+RECOVERY_INTERVAL = 600
+
+
+class AddressRecovery:
+    """Finds a device that stopped answering at its address.
+
+    Used as error listener of the status cache. After a few refreshes
+    failed in a row, a hello is broadcast and the device is looked up by
+    the id saved with its session; when the entry has a MAC address, the
+    device found must also report it. The entry is then moved to the new
+    address, which reloads it.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, manager: DeviceManager) -> None:
+        self._hass = hass
+        self._entry = entry
+        self._manager = manager
+        self._last_attempt = -RECOVERY_INTERVAL
+        self._running = False
+
+    def __call__(self, failures: int, error: Exception) -> None:
+        """Start a search once the device failed often enough."""
+        if (
+            failures < RECOVERY_FAILURES
+            or isinstance(error, DeviceBusy)
+            or self._running
+            or time.monotonic() - self._last_attempt < RECOVERY_INTERVAL
+        ):
+            return
+        device_id = self._manager.sessions.device_id(self._entry.options[CONF_HOST])
+        if device_id is None:
+            # the device never answered a hello, nothing to recognize it by
+            return
+        self._running = True
+        self._hass.async_create_task(self._async_recover(device_id))
+
+    async def _async_recover(self, device_id: bytes) -> None:
+        """Look for the device and move the entry to its new address."""
+        host = self._entry.options[CONF_HOST]
+        try:
+            _LOGGER.debug("%s stopped answering, looking for %s", host, device_id.hex())
+            found = await self._hass.async_add_executor_job(self._manager.transport.discover)
+            addresses = [
+                address for address, found_id in found.items()
+                if found_id == device_id and address != host
+            ]
+            if not addresses:
+                return
+            address = addresses[0]
+            if any(
+                entry.options.get(CONF_HOST) == address
+                for entry in self._hass.config_entries.async_entries(DOMAIN)
+            ):
+                return
+            mac = self._entry.options.get(CONF_MAC)
+            if mac:
+                device = Device(address, self._entry.options[CONF_TOKEN])
+                use_shared_transport(device, self._manager.transport)
+                info = await self._manager.executor.async_run(device.info, shed=False)
+                if info.mac_address.lower() != mac.lower():
+                    _LOGGER.debug("%s at %s is not %s", device_id.hex(), address, mac)
+                    return
+
+            _LOGGER.warning("%s moved from %s to %s", self._entry.title, host, address)
+            self._hass.config_entries.async_update_entry(
+                self._entry, options={**self._entry.options, CONF_HOST: address})
+        except DeviceException as ex:
+            _LOGGER.debug("Looking for %s failed: %s", host, ex)
+        finally:
+            self._running = False
+            self._last_attempt = time.monotonic()
@@ -1,12 +1,16 @@
 """Support for Xiaomi Mi/QingPing Air Quality Monitor service."""
 import logging
+import time
 from datetime import timedelta
+from functools import partial
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util, slugify
 from homeassistant.const import (
     CONF_HOST,
     CONF_TOKEN
@@ -14,16 +18,25 @@ from homeassistant.const import (
 from miio import DeviceException
 
 from .const import (
+    CONF_ENTITY_MODE,
     CONF_MODEL,
+    CONF_SMOOTHING_WINDOW,
+    CONF_ZONE,
     DATA_KEY,
+    DATA_ZONES,
+    DEFAULT_SMOOTHING_WINDOW,
     DOMAIN,
+    ENTITY_MODE_FULL,
+    ENTITY_MODE_SNAPSHOT,
     AIRQUALITY_SENSORS,
+    AIRQUALITY_SNAPSHOT_SENSOR,
     MODELS_ALL_DEVICES,
-    MODELS_MIOT,
     AVAILABLE_FEATURES,
-    BATTERY_STATE_LITE,
     XiaomiAirQualitySensorDescription
 )
+from .history import STATISTICS_ATTRIBUTES
+from .smoothing import SMOOTHED_READINGS, TimeWeightedAverage
+from .zones import ZONE_METRICS, ZONE_STATISTICS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,34 +52,64 @@ async def async_setup_entry(
     name = entry.title
     unique_id = entry.unique_id
 
-    airquality = hass.data[DOMAIN][host]
+    # hold the device until the entry is unloaded
+    handle = hass.data[DATA_KEY].acquire(host, f"{entry.entry_id}.sensor")
+    entry.async_on_unload(partial(hass.data[DATA_KEY].release, host, f"{entry.entry_id}.sensor"))
+    airquality = handle.device
+    cache = handle.cache
 
     try:
         entities = []
 
-        for description in AIRQUALITY_SENSORS:
-            if model in MODELS_ALL_DEVICES:
-                features = AVAILABLE_FEATURES.get(model, [])
-                if features:
-                    for feature in features:
-                        if feature == description.key:
-                            entities.extend(
-                                [XiaomiAirQualitySensor(entry.options, description, name, unique_id, airquality)]
-                            )
-                else:
-                    entities.extend(
-                        [XiaomiAirQualitySensor(entry.options, description, name, unique_id, airquality)]
-                    )
+        if entry.options.get(CONF_ENTITY_MODE, ENTITY_MODE_FULL) == ENTITY_MODE_SNAPSHOT:
+            # one entity for the device instead of one per reading
+            entities.append(XiaomiAirQualitySnapshotSensor(
+                entry.options, AIRQUALITY_SNAPSHOT_SENSOR, name, unique_id, airquality, cache))
+        else:
+            for description in AIRQUALITY_SENSORS:
+                if model in MODELS_ALL_DEVICES:
+                    features = AVAILABLE_FEATURES.get(model, [])
+                    if features:
+                        for feature in features:
+                            if feature == description.key:
+                                entities.extend(
+                                    [XiaomiAirQualitySensor(entry.options, description, name, unique_id, airquality, cache)]
+                                )
+                    else:
+                        entities.extend(
+                            [XiaomiAirQualitySensor(entry.options, description, name, unique_id, airquality, cache)]
+                        )
+
+        window = entry.options.get(CONF_SMOOTHING_WINDOW, DEFAULT_SMOOTHING_WINDOW)
+        if window:
+            entities.extend([
+                XiaomiAirQualitySmoothedSensor(
+                    entry.options, entity.entity_description, name, unique_id,
+                    airquality, cache, window * 60)
+                for entity in entities
+                if entity.entity_description.key in SMOOTHED_READINGS
+            ])
 
         async_add_entities(entities)
+
+        zone = hass.data.get(DATA_ZONES, {}).get(entry.options.get(CONF_ZONE, "").strip())
+        if zone is not None:
+            # added now if the entry owns the zone, else once it takes the zone over
+            zone.adopt(entry.entry_id, lambda: async_add_entities([
+                XiaomiAirQualityZoneSensor(zone, description, statistic)
+                for description in AIRQUALITY_SENSORS
+                if description.key in ZONE_METRICS
+                for statistic in ZONE_STATISTICS
+            ]))
     except AttributeError as ex:
         _LOGGER.error(ex)
 
 class XiaomiAirQualitySensor(SensorEntity):
     """Implementation of a Xiaomi Mi/QingPing Air Quality Monitor sensor."""
     entity_description: XiaomiAirQualitySensorDescription
+    _unrecorded_attributes = STATISTICS_ATTRIBUTES
 
-    def __init__(self, entry_data, description, name, unique_id, airquality):
+    def __init__(self, entry_data, description, name, unique_id, airquality, cache):
         self.entity_description = description
         self._entry_data = entry_data
         self._name = name
@@ -76,6 +119,7 @@ class XiaomiAirQualitySensor(SensorEntity):
         self._mac = entry_data[CONF_TOKEN]
         self._host = entry_data[CONF_HOST]
         self._airquality = airquality
+        self._cache = cache
         self._available = True
         self._skip_update = False
         self._state = None
@@ -115,11 +159,24 @@ class XiaomiAirQualitySensor(SensorEntity):
 
         return device_info
 
+    @property
+    def available(self) -> bool:
+        """Return true when state is known."""
+        return self._available
+
     @property
     def native_value(self):
         """Return the state of the sensor."""
         return self._state
 
+    @property
+    def extra_state_attributes(self):
+        """Return the rolling statistics of the sensor."""
+        history = self._cache.history
+        if history is None or self._attr not in history.columns:
+            return None
+        return history.statistics(self._attr)
+
     async def async_update(self):
         """Fetch state from the device."""
         # On state change the device doesn't provide the new state immediately.
@@ -128,22 +185,11 @@ class XiaomiAirQualitySensor(SensorEntity):
             return
 
         try:
-            if self.hass.data[DATA_KEY][self._host].get("status", None):
-                state = self.hass.data[DATA_KEY][self._host]["status"]
-            else:
-                state = await self.hass.async_add_executor_job(self._airquality.status)
+            state = await self._cache.async_get()
             _LOGGER.debug("Got new state: %s", state)
 
             self._available = True
-            if getattr(state, "tvoc_unit", None):
-                self._attr_native_unit_of_measurement = getattr(state, "tvoc_unit", None)
-            else:
-                if self._attr == "battery_state" and self._model in MODELS_MIOT:
-                    value = getattr(state, self._attr, None)
-                    self._state = list(BATTERY_STATE_LITE.keys())[list(
-                                        BATTERY_STATE_LITE.values()).index(value)]
-                else:
-                    self._state = getattr(state, self._attr, None)
+            self._state = getattr(state, self._attr, None)
 
         except UnboundLocalError:
             pass
@@ -154,3 +200,140 @@ class XiaomiAirQualitySensor(SensorEntity):
                 self._available = False
                 _LOGGER.error("Got exception while fetching the state: %s", ex)
 
+
+class XiaomiAirQualitySnapshotSensor(XiaomiAirQualitySensor):
+    """All readings of a Xiaomi Mi/QingPing Air Quality Monitor in one sensor.
+
+    The state is the time of the last fetched status and the readings are
+    its attributes, so a device costs a single entity.
+    """
+
+    def __init__(self, entry_data, description, name, unique_id, airquality, cache):
+        super().__init__(entry_data, description, name, unique_id, airquality, cache)
+        self._readings = {}
+
+    @property
+    def extra_state_attributes(self):
+        """Return the readings of the last status."""
+        return self._readings
+
+    async def async_update(self):
+        """Fetch the readings from the device."""
+        try:
+            state = await self._cache.async_get()
+            entry = self._cache.entry
+            self._available = True
+            self._state = dt_util.utc_from_timestamp(entry.timestamp) if entry else None
+            self._readings = {
+                key: value for key, value in state.data.items() if value is not None
+            }
+        except DeviceException as ex:
+            if self._available:
+                self._available = False
+                _LOGGER.error("Got exception while fetching the state: %s", ex)
+
+
+class XiaomiAirQualitySmoothedSensor(XiaomiAirQualitySensor):
+    """Time-weighted average of a Xiaomi Mi/QingPing Air Quality Monitor sensor.
+
+    Fed by every status fetched for the device and published once per
+    window, so the recorder stores one value per window instead of one per
+    poll.
+    """
+    _attr_should_poll = False
+    _unrecorded_attributes = frozenset()
+
+    def __init__(self, entry_data, description, name, unique_id, airquality, cache, window):
+        super().__init__(entry_data, description, name, unique_id, airquality, cache)
+        self._window = window
+        self._average = TimeWeightedAverage(window)
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return "{} {} Average".format(self._name, self.entity_description.name)
+
+    @property
+    def unique_id(self):
+        """Return the unique of the sensor."""
+        return "{}_{}_average".format(self._name, self.entity_description.key)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the averaging window."""
+        return {"window": self._window}
+
+    async def async_added_to_hass(self):
+        """Follow the statuses of the device and publish the average periodically."""
+        history = self._cache.history
+        now = time.time()
+        if history is not None and self._attr in history.columns:
+            index = history.columns.index(self._attr)
+            for timestamp, readings in history.samples(now - self._window, now):
+                self._average.add(timestamp, readings[index])
+        self._state = self._average.average(now)
+
+        self.async_on_remove(self._cache.add_listener(
+            lambda timestamp, status: self._average.add(
+                timestamp, getattr(status, self._attr, None))))
+        self.async_on_remove(async_track_time_interval(
+            self.hass, self._async_publish, timedelta(seconds=self._window)))
+
+    async def _async_publish(self, now):
+        """Publish the average of the last window."""
+        self._available = self._cache.get() is not None
+        self._state = self._average.average(time.time())
+        self.async_write_ha_state()
+
+    async def async_update(self):
+        """Nothing to fetch, the average is pushed."""
+
+
+class XiaomiAirQualityZoneSensor(SensorEntity):
+    """Implementation of an aggregate sensor over the monitors of a zone.
+
+    Pushed by the zone whenever a member reports.
+    """
+    entity_description: XiaomiAirQualitySensorDescription
+    _attr_should_poll = False
+
+    STATISTIC_NAMES = {
+        "mean": "Mean",
+        "max": "Max",
+        "p90": "90th Percentile"
+    }
+
+    def __init__(self, zone, description, statistic):
+        self.entity_description = description
+        self._zone = zone
+        self._statistic = statistic
+        self._attr_name = "{} {} {}".format(
+            zone.name, description.name, self.STATISTIC_NAMES[statistic])
+        self._attr_unique_id = "zone_{}_{}_{}".format(
+            slugify(zone.name), description.key, statistic)
+        self._attr_native_unit_of_measurement = description.native_unit_of_measurement
+        self._attr_device_class = description.device_class
+        self._attr_state_class = description.state_class
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, "zone_{}".format(slugify(zone.name)))},
+            "manufacturer": "Xiaomi",
+            "name": "{} Zone".format(zone.name),
+            "model": "Zone",
+            "entry_type": dr.DeviceEntryType.SERVICE
+        }
+
+    async def async_added_to_hass(self):
+        """Follow the aggregates of the zone."""
+        self._read()
+        self.async_on_remove(self._zone.add_listener(self._handle_zone_update))
+
+    def _handle_zone_update(self):
+        """Publish the aggregate after a member report."""
+        self._read()
+        self.async_write_ha_state()
+
+    def _read(self):
+        """Read the aggregate of the zone, kept up to date by its members."""
+        statistic = self._zone.statistics[self.entity_description.key]
+        self._attr_native_value = getattr(statistic, self._statistic)
+        self._attr_extra_state_attributes = {"members": len(statistic)}
@@ -0,0 +1,174 @@
+"""Services of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import asyncio
+
+import voluptuous as vol
+
+import homeassistant.helpers.config_validation as cv
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from miio import DeviceException
+
+from .const import (
+    DATA_EXPORTER,
+    DATA_KEY,
+    DOMAIN
+)
+from .devices import send_batched
+from .export import EXPORT_CSV, EXPORT_FORMATS
+
+SERVICE_EXPORT_READINGS = "export_readings"
+SERVICE_SNAPSHOT = "snapshot"
+SERVICE_GET_PROPERTIES = "get_properties"
+SERVICE_SET_PROPERTIES = "set_properties"
+
+ATTR_HOSTS = "hosts"
+ATTR_FORMAT = "format"
+ATTR_GZIP = "gzip"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_INCREMENTAL = "incremental"
+ATTR_FILENAME = "filename"
+ATTR_REFRESH = "refresh"
+ATTR_PROPERTIES = "properties"
+ATTR_SIID = "siid"
+ATTR_PIID = "piid"
+ATTR_VALUE = "value"
+
+EXPORT_READINGS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_HOSTS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_FORMAT, default=EXPORT_CSV): vol.In(EXPORT_FORMATS),
+        vol.Optional(ATTR_GZIP, default=False): cv.boolean,
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_INCREMENTAL, default=False): cv.boolean,
+        vol.Optional(ATTR_FILENAME): cv.string,
+    }
+)
+
+SNAPSHOT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_HOSTS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_REFRESH, default=False): cv.boolean,
+    }
+)
+
+
+
+def property_schema(with_value: bool):
+    """Return the validator of a property, given as dict or as [siid, piid(, value)]."""
+    keys = (ATTR_SIID, ATTR_PIID, ATTR_VALUE) if with_value else (ATTR_SIID, ATTR_PIID)
+    schema = vol.Schema({
+        vol.Required(ATTR_SIID): vol.Coerce(int),
+        vol.Required(ATTR_PIID): vol.Coerce(int),
+        **({vol.Required(ATTR_VALUE): vol.Any(bool, int, float, str)} if with_value else {})
+    })
+
+    def validate(value):
+        if isinstance(value, (list, tuple)):
+            if len(value) != len(keys):
+                raise vol.Invalid(f"expected {list(keys)}")
+            value = dict(zip(keys, value))
+        return schema(value)
+
+    return validate
+
+
+GET_PROPERTIES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_HOSTS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_PROPERTIES): vol.All(
+            cv.ensure_list, vol.Length(min=1), [property_schema(False)]),
+    }
+)
+
+SET_PROPERTIES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_HOSTS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_PROPERTIES): vol.All(
+            cv.ensure_list, vol.Length(min=1), [property_schema(True)]),
+    }
+)
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the component."""
+
+    async def async_export_readings(call: ServiceCall):
+        """Export the buffered readings to a file."""
+        return await hass.data[DATA_EXPORTER].async_export(
+            hosts=call.data.get(ATTR_HOSTS),
+            export_format=call.data[ATTR_FORMAT],
+            compress=call.data[ATTR_GZIP],
+            start=call.data.get(ATTR_START),
+            end=call.data.get(ATTR_END),
+            incremental=call.data[ATTR_INCREMENTAL],
+            filename=call.data.get(ATTR_FILENAME)
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_READINGS,
+        async_export_readings,
+        schema=EXPORT_READINGS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL
+    )
+
+    async def async_snapshot(call: ServiceCall):
+        """Return the current status of the monitors."""
+        manager = hass.data[DATA_KEY]
+        hosts = call.data.get(ATTR_HOSTS) or list(manager)
+        handles = [handle for handle in map(manager.get, hosts) if handle is not None]
+        if call.data[ATTR_REFRESH]:
+            # failures show up in the health of the device
+            await asyncio.gather(
+                *[handle.cache.async_get(force=True) for handle in handles],
+                return_exceptions=True
+            )
+        return {
+            "devices": {handle.host: handle.snapshot() for handle in handles},
+            "executor": manager.executor.metrics()
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SNAPSHOT,
+        async_snapshot,
+        schema=SNAPSHOT_SCHEMA,
+        supports_response=SupportsResponse.ONLY
+    )
+
+    async def async_send_properties(call: ServiceCall):
+        """Read or write MIoT properties of the monitors, batched per device."""
+        command = call.service
+        manager = hass.data[DATA_KEY]
+        hosts = call.data.get(ATTR_HOSTS) or list(manager)
+        properties = call.data[ATTR_PROPERTIES]
+
+        async def async_send(host):
+            handle = manager.get(host)
+            if handle is None:
+                return {"error": "Unknown host"}
+            try:
+                return {"results": await handle.cache.async_call(
+                    send_batched, handle.device, command, properties)}
+            except DeviceException as ex:
+                return {"error": str(ex)}
+
+        results = await asyncio.gather(*[async_send(host) for host in hosts])
+        if command == SERVICE_SET_PROPERTIES:
+            # the cached statuses no longer match the devices
+            for handle in filter(None, map(manager.get, hosts)):
+                handle.cache.invalidate()
+        return {"devices": dict(zip(hosts, results))}
+
+    for service, schema in (
+        (SERVICE_GET_PROPERTIES, GET_PROPERTIES_SCHEMA),
+        (SERVICE_SET_PROPERTIES, SET_PROPERTIES_SCHEMA)
+    ):
+        hass.services.async_register(
+            DOMAIN,
+            service,
+            async_send_properties,
+            schema=schema,
+            supports_response=SupportsResponse.OPTIONAL
+        )
@@ -0,0 +1,67 @@
+"""Device sessions of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+from typing import Any, Dict
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .transport import SharedMiIOProtocol
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.sessions"
+
+# seconds the clock offset of a device may drift before it is saved again
+STAMP_TOLERANCE = 5
+
+
+class SessionStore:
+    """Sessions of the devices by host, kept across restarts.
+
+    A restored session lets the first request after a restart go out
+    without a hello. Should the device have rebooted meanwhile, that
+    request times out and the protocol falls back to a hello.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._sessions: Dict[str, Dict[str, Any]] | None = None
+
+    async def async_load(self) -> None:
+        """Load the saved sessions once."""
+        if self._sessions is None:
+            self._sessions = await self._store.async_load() or {}
+
+    def restore(self, host: str, protocol: SharedMiIOProtocol) -> None:
+        """Resume the saved session of a host, if any."""
+        session = (self._sessions or {}).get(host)
+        if session is not None:
+            protocol.restore(session)
+
+    def device_id(self, host: str) -> bytes | None:
+        """Return the id the device at host last answered a hello with.
+
+        Kept when the protocol drops its session after a timeout, so the
+        device can still be recognized at another address.
+        """
+        session = (self._sessions or {}).get(host)
+        return bytes.fromhex(session["device_id"]) if session is not None else None
+
+    async def async_save(self) -> None:
+        """Save the sessions now instead of after the delay."""
+        if self._sessions is not None:
+            await self._store.async_save(self._sessions)
+
+    def remember(self, host: str, protocol: SharedMiIOProtocol) -> None:
+        """Save the session of a host when it changed."""
+        session = protocol.session
+        if session is None or self._sessions is None:
+            return
+        saved = self._sessions.get(host)
+        if (
+            saved is not None
+            and saved["device_id"] == session["device_id"]
+            and abs(saved["stamp_offset"] - session["stamp_offset"]) < STAMP_TOLERANCE
+        ):
+            return
+        self._sessions[host] = session
+        self._store.async_delay_save(lambda: self._sessions, 10)
@@ -0,0 +1,77 @@
+"""Smoothed readings of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+from collections import deque
+
+SMOOTHED_READINGS = (
+    "temperature",
+    "humidity",
+    "co2",
+    "pm25",
+    "pm10",
+    "tvoc"
+)
+
+
+class TimeWeightedAverage:
+    """Time-weighted average of a reading over a sliding window.
+
+    Each value holds until the next one arrives. The segments between
+    values are kept in a queue together with their running area and
+    duration, so adding a value and reading the average cost amortized
+    constant time however often the device is polled.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._segments = deque()
+        self._area = 0.0
+        self._duration = 0.0
+        self._last: tuple[float, float] | None = None
+
+    def add(self, timestamp: float, value: float | None) -> None:
+        """Add the value of the reading at timestamp, None for a gap."""
+        if self._last is not None:
+            start, previous = self._last
+            if timestamp > start:
+                self._segments.append((start, timestamp, previous))
+                self._area += previous * (timestamp - start)
+                self._duration += timestamp - start
+        if value is None or isinstance(value, str) or value != value:
+            self._last = None
+        else:
+            self._last = (timestamp, value)
+        self._evict(timestamp)
+
+    def _evict(self, now: float) -> None:
+        """Drop the segments ending before the window."""
+        cutoff = now - self.window
+        segments = self._segments
+        while segments and segments[0][1] <= cutoff:
+            start, end, value = segments.popleft()
+            self._area -= value * (end - start)
+            self._duration -= end - start
+        if not segments:
+            self._area = 0.0
+            self._duration = 0.0
+
+    def average(self, now: float) -> float | None:
+        """Return the average over the window ending now."""
+        self._evict(now)
+        cutoff = now - self.window
+        area = self._area
+        duration = self._duration
+        if self._segments:
+            start, _, value = self._segments[0]
+            if start < cutoff:
+                area -= value * (cutoff - start)
+                duration -= cutoff - start
+        if self._last is not None:
+            start, value = self._last
+            start = max(start, cutoff)
+            if now > start:
+                area += value * (now - start)
+                duration += now - start
+            elif duration <= 0:
+                return value
+        if duration <= 0:
+            return None
+        return round(area / duration, 2)
@@ -0,0 +1,134 @@
+"""MIoT spec handling of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import hashlib
+import json
+import logging
+import marshal
+import os
+import sys
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
+
+from .models import (
+    DOMAIN,
+    MODEL_AIRQUALITYMONITOR_LITE,
+    MODEL_AIRQUALITYMONITOR_LITE_DANY
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SPEC_DIR = os.path.join(os.path.dirname(__file__), "specs")
+SPEC_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    DOMAIN
+)
+SPEC_CACHE_FORMAT = 3
+
+# models implementing the spec of another model
+SPEC_MODELS = {
+    MODEL_AIRQUALITYMONITOR_LITE_DANY: MODEL_AIRQUALITYMONITOR_LITE
+}
+
+ACCESS_READ = 1
+ACCESS_WRITE = 2
+ACCESS_NOTIFY = 4
+
+ACCESS_FLAGS = {
+    "read": ACCESS_READ,
+    "write": ACCESS_WRITE,
+    "notify": ACCESS_NOTIFY
+}
+
+
+class MiotSpec(NamedTuple):
+    """Properties and actions of a model as found in its MIoT spec."""
+
+    model: str
+    version: int
+    properties: Tuple[Tuple[str, int, int, int], ...]
+    actions: Tuple[Tuple[str, int, int], ...]
+
+    @property
+    def mapping(self) -> Dict[str, Dict[str, int]]:
+        """Return the python-miio mapping of the spec."""
+        mapping = {
+            did: {"siid": siid, "piid": piid}
+            for did, siid, piid, _ in self.properties
+        }
+        mapping.update({
+            did: {"siid": siid, "aiid": aiid}
+            for did, siid, aiid in self.actions
+        })
+        return mapping
+
+    def access(self, did: str) -> int:
+        """Return the access flags of a property."""
+        for name, _, _, access in self.properties:
+            if name == did:
+                return access
+        return 0
+
+
+def _urn_name(urn: str) -> str:
+    """Return the name part of a MIoT spec type."""
+    return urn.split(":")[3]
+
+
+def _parse_spec(model: str, content: bytes) -> MiotSpec:
+    """Parse the MIoT spec JSON of a model."""
+    spec = json.loads(content)
+
+    properties = []
+    actions = []
+    for service in spec["services"]:
+        siid = service["iid"]
+        for prop in service.get("properties", []):
+            access = 0
+            for flag in prop.get("access", []):
+                access |= ACCESS_FLAGS.get(flag, 0)
+            properties.append((_urn_name(prop["type"]), siid, prop["iid"], access))
+        for action in service.get("actions", []):
+            actions.append((_urn_name(action["type"]), siid, action["iid"]))
+
+    return MiotSpec(
+        model,
+        int(spec["type"].rsplit(":", 1)[1]),
+        tuple(properties),
+        tuple(actions)
+    )
+
+
+@lru_cache(maxsize=None)
+def load_spec(model: str) -> MiotSpec:
+    """Return the spec of a model bundled in the specs folder.
+
+    The parsed spec is kept marshalled in the user cache directory, and
+    reused as long as the content of the JSON file and the Python version
+    do not change. Failing to write the cache only costs parsing the JSON
+    again.
+    """
+    path = os.path.join(SPEC_DIR, f"{SPEC_MODELS.get(model, model)}.json")
+    with open(path, "rb") as spec_file:
+        content = spec_file.read()
+    source = (hashlib.sha256(content).hexdigest(), tuple(sys.version_info[:2]))
+    cache_path = os.path.join(SPEC_CACHE_DIR, f"{model}.{sys.implementation.cache_tag}.marshal")
+
+    try:
+        with open(cache_path, "rb") as cache_file:
+            cache_format, cached_source, version, properties, actions = \
+                marshal.load(cache_file)
+        if cache_format == SPEC_CACHE_FORMAT and cached_source == source:
+            return MiotSpec(model, version, properties, actions)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    spec = _parse_spec(model, content)
+    try:
+        os.makedirs(SPEC_CACHE_DIR, exist_ok=True)
+        with open(cache_path, "wb") as cache_file:
+            marshal.dump(
+                (SPEC_CACHE_FORMAT, source, spec.version, spec.properties, spec.actions),
+                cache_file
+            )
+    except OSError as ex:
+        _LOGGER.debug("Unable to cache the spec of %s: %s", model, ex)
+    return spec
@@ -0,0 +1,55 @@
+"""Compact status containers of the Xiaomi Mi/QingPing Air Quality Monitor."""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Tuple
+
+
+class CompactStatus:
+    """Base of the per-model status containers.
+
+    Subclasses list every attribute the device family can report in
+    FIELDS. status_class() derives a class per model whose __slots__ hold
+    only the attributes that model reports, so an instance is a single
+    fixed-size object without a per-poll dict. Known attributes the model
+    does not report read as None.
+    """
+
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+
+    def __init__(self, *values) -> None:
+        setter = object.__setattr__
+        for name, value in zip(self.__slots__, values):
+            setter(self, name, value)
+        for name in self.__slots__[len(values):]:
+            setter(self, name, None)
+
+    def __getattr__(self, name: str) -> Any:
+        if name in type(self).FIELDS:
+            return None
+        raise AttributeError(name)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Return the status as a dict."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def properties(self) -> Iterable[str]:
+        """Return the names of the properties with a value."""
+        return (name for name in self.__slots__ if getattr(self, name) is not None)
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            "%s=%s" % (name, getattr(self, name)) for name in self.__slots__)
+        return "<%s %s>" % (type(self).__name__, values)
+
+    def __json__(self):
+        return self.data
+
+
+@lru_cache(maxsize=None)
+def status_class(base: type, fields: Tuple[str, ...]) -> type:
+    """Return the status container of base holding only the given fields."""
+    unknown = set(fields) - set(base.FIELDS)
+    if unknown:
+        raise ValueError("Unknown status fields for %s: %s" % (base.__name__, unknown))
+    return type(base.__name__, (base,), {"__slots__": fields})
@@ -15,9 +15,11 @@ from homeassistant.const import (
 from miio import DeviceException
 
 from .const import (
+    CONF_ENTITY_MODE,
     CONF_MODEL,
     DATA_KEY,
     DOMAIN,
+    ENTITY_MODE_FULL,
     AIRQUALITY_SWITCHS,
     MODELS_MIIO_W_SWITCH,
     XiaomiAirQualitySwitchDescription
@@ -37,7 +39,15 @@ async def async_setup_entry(
     name = entry.title
     unique_id = entry.unique_id
 
-    airquality = hass.data[DOMAIN][host]
+    if entry.options.get(CONF_ENTITY_MODE, ENTITY_MODE_FULL) != ENTITY_MODE_FULL:
+        # the lightweight modes expose the readings only
+        return
+
+    # hold the device until the entry is unloaded
+    handle = hass.data[DATA_KEY].acquire(host, f"{entry.entry_id}.switch")
+    entry.async_on_unload(partial(hass.data[DATA_KEY].release, host, f"{entry.entry_id}.switch"))
+    airquality = handle.device
+    cache = handle.cache
 
     try:
         entities = []
@@ -45,7 +55,7 @@ async def async_setup_entry(
         for description in AIRQUALITY_SWITCHS:
             if model in MODELS_MIIO_W_SWITCH:
                 entities.extend(
-                    [XiaomiAirQualitySwitch(entry.options, description, name, unique_id, airquality)]
+                    [XiaomiAirQualitySwitch(entry.options, description, name, unique_id, airquality, cache)]
                 )
 
         async_add_entities(entities)
@@ -56,7 +66,7 @@ class XiaomiAirQualitySwitch(SwitchEntity):
     """Implementation of a Xiaomi Mi/QingPing Air Quality Monitor Switch."""
     entity_description: XiaomiAirQualitySwitchDescription
 
-    def __init__(self, entry_data, description, name, unique_id, airquality):
+    def __init__(self, entry_data, description, name, unique_id, airquality, cache):
         self.entity_description = description
         self._entry_data = entry_data
         self._name = name
@@ -66,6 +76,7 @@ class XiaomiAirQualitySwitch(SwitchEntity):
         self._mac = entry_data[CONF_TOKEN]
         self._host = entry_data[CONF_HOST]
         self._airquality = airquality
+        self._cache = cache
         self._available = True
         self._skip_update = False
         self._state = None
@@ -102,6 +113,11 @@ class XiaomiAirQualitySwitch(SwitchEntity):
 
         return device_info
 
+    @property
+    def available(self) -> bool:
+        """Return true when state is known."""
+        return self._available
+
     @property
     def is_on(self) -> bool:
         """Return the state of the switch."""
@@ -110,7 +126,7 @@ class XiaomiAirQualitySwitch(SwitchEntity):
     async def _try_command(self, mask_error, func, *args, **kwargs):
         """Call a airquality command handling error messages."""
         try:
-            result = await self.hass.async_add_executor_job(
+            result = await self._cache.async_call(
                 partial(func, *args, **kwargs)
             )
 
@@ -165,10 +181,7 @@ class XiaomiAirQualitySwitch(SwitchEntity):
             return
 
         try:
-            if self.hass.data[DATA_KEY][self._host].get("status", None):
-                state = self.hass.data[DATA_KEY][self._host]["status"]
-            else:
-                state = await self.hass.async_add_executor_job(self._airquality.status)
+            state = await self._cache.async_get()
             _LOGGER.debug("Got new state: %s", state)
 
             self._available = True
@@ -0,0 +1,124 @@
+"""Device traffic recording and replay of the Xiaomi Mi/QingPing Air Quality Monitor component.
+
+A recording is a gzip compressed NDJSON file, one exchange per line:
+
+    {"at": 0.0, "command": "get_prop", "params": [...], "elapsed": 0.042, "result": [...]}
+
+with "error" instead of "result" for failed exchanges. Requests and
+responses are recorded after decryption, so replaying needs no token.
+"""
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict
+
+from miio import DeviceError, DeviceException
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _key(command: str, params: Any) -> str:
+    """Return the lookup key of a request."""
+    return json.dumps([command, params], sort_keys=True, separators=(",", ":"))
+
+
+class RecordingProtocol:
+    """Protocol passing requests through to another one, recording every exchange."""
+
+    def __init__(self, protocol, path: str) -> None:
+        self._protocol = protocol
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    def __getattr__(self, name: str):
+        return getattr(self._protocol, name)
+
+    def send(self, command: str, parameters: Any = None, retry_count: int = 3, **kwargs):
+        """Send a request and record it with its response and timing."""
+        exchange: Dict[str, Any] = {
+            "at": round(time.monotonic() - self._started, 3),
+            "command": command,
+            "params": parameters
+        }
+        start = time.perf_counter()
+        try:
+            result = self._protocol.send(command, parameters, retry_count, **kwargs)
+            exchange["result"] = result
+            return result
+        except DeviceError as ex:
+            exchange["error"] = {"type": "DeviceError", "error": ex.args[0] if ex.args else None}
+            raise
+        except DeviceException as ex:
+            exchange["error"] = {"type": "DeviceException", "message": str(ex)}
+            raise
+        finally:
+            exchange["elapsed"] = round(time.perf_counter() - start, 4)
+            line = json.dumps(exchange, separators=(",", ":"), default=str) + "\n"
+            with self._lock:
+                self._file.write(line)
+
+    def close(self) -> None:
+        """Flush and close the recording."""
+        with self._lock:
+            self._file.close()
+
+
+class ReplayProtocol:
+    """Protocol answering requests from a recording instead of the network.
+
+    Each request gets the next recorded response of the same command and
+    parameters, cycling when they run out, after the recorded response
+    time multiplied by speed (0 answers at once).
+    """
+
+    def __init__(self, path: str, speed: float = 1.0) -> None:
+        self.speed = speed
+        self._exchanges = defaultdict(list)
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        with gzip.open(path, "rt", encoding="utf-8") as recording:
+            for line in recording:
+                exchange = json.loads(line)
+                key = _key(exchange["command"], exchange.get("params"))
+                self._exchanges[key].append(exchange)
+        _LOGGER.debug(
+            "Loaded %s exchanges from %s",
+            sum(len(exchanges) for exchanges in self._exchanges.values()), path)
+
+    def send(self, command: str, parameters: Any = None, retry_count: int = 3, **kwargs):
+        """Return the recorded response of a request."""
+        key = _key(command, parameters)
+        with self._lock:
+            exchanges = self._exchanges.get(key)
+            if not exchanges:
+                raise DeviceException(f"No recorded response to {command} {parameters}")
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = (cursor + 1) % len(exchanges)
+        exchange = exchanges[cursor]
+        if self.speed:
+            time.sleep(exchange.get("elapsed", 0) * self.speed)
+        error = exchange.get("error")
+        if error is None:
+            return exchange.get("result")
+        if error["type"] == "DeviceError":
+            raise DeviceError(error["error"])
+        raise DeviceException(error["message"])
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def record(device, path: str) -> RecordingProtocol:
+    """Record the traffic of a device to path, appending to it."""
+    device._protocol = RecordingProtocol(device._protocol, path)  # pylint: disable=protected-access
+    return device._protocol  # pylint: disable=protected-access
+
+
+def replay(device, path: str, speed: float = 1.0) -> ReplayProtocol:
+    """Serve the requests of a device from the recording at path."""
+    device._protocol = ReplayProtocol(path, speed)  # pylint: disable=protected-access
+    return device._protocol  # pylint: disable=protected-access
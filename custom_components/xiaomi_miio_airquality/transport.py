@@ -0,0 +1,373 @@
+"""Shared UDP transport of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+import calendar
+import hashlib
+import json
+import logging
+import socket
+import struct
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from miio import DeviceError, DeviceException
+from miio.exceptions import RecoverableError
+from miio.miioprotocol import MiIOProtocol
+from miio.protocol import Message
+
+_LOGGER = logging.getLogger(__name__)
+
+MIIO_PORT = 54321
+HELLO = bytes.fromhex("21310020ffffffffffffffffffffffffffffffffffffffffffffffffffffffff")
+HELLO_LENGTH = len(HELLO)
+RECOVERABLE_ERRORS = (-30001, -9999)
+
+# key of the waiters of a hello response
+HELLO_ID = -1
+
+# private members of MiIOProtocol the shared protocol builds on
+PROTOCOL_INTERNALS = (
+    "_MiIOProtocol__id",
+    "_create_request",
+    "_device_id",
+    "_device_ts",
+    "_discovered",
+    "_timeout"
+)
+
+# magic, length, unknown, device id, stamp; followed by the checksum
+HEADER = struct.Struct(">HHI4sI")
+MAGIC = 0x2131
+
+
+class InvalidToken(DeviceException):
+    """The checksum of a response does not match the token."""
+
+
+class MessageCodec:
+    """Encoding of the miIO packets of one device.
+
+    The AES key and IV follow from the token alone, so they are derived
+    once instead of for every message, and packets are packed with
+    struct rather than parsed through construct.
+    """
+
+    def __init__(self, token: bytes) -> None:
+        self.token = token
+        key = hashlib.md5(token).digest()  # nosec
+        iv = hashlib.md5(key + token).digest()  # nosec
+        self._cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
+
+    def encode(self, payload: Dict[str, Any], device_id: bytes, stamp: int) -> bytes:
+        """Return the packet of a request."""
+        plaintext = json.dumps(payload).encode("utf-8") + b"\x00"
+        pad = 16 - len(plaintext) % 16
+        encryptor = self._cipher.encryptor()
+        data = encryptor.update(plaintext + bytes((pad,)) * pad) + encryptor.finalize()
+        header = HEADER.pack(MAGIC, HEADER.size + 16 + len(data), 0, device_id, stamp)
+        return header + hashlib.md5(header + self.token + data).digest() + data  # nosec
+
+    def decode(self, packet: bytes) -> Tuple[int, Dict[str, Any]]:
+        """Return the stamp and payload of a response packet."""
+        header = packet[:HEADER.size]
+        data = packet[HEADER.size + 16:]
+        if hashlib.md5(header + self.token + data).digest() != packet[HEADER.size:HEADER.size + 16]:  # nosec
+            raise InvalidToken(
+                "Got checksum error which indicates use "
+                "of an invalid token. "
+                "Please check your token!")
+        stamp = HEADER.unpack(header)[4]
+        decryptor = self._cipher.decryptor()
+        plaintext = decryptor.update(data) + decryptor.finalize()
+        plaintext = plaintext[:-plaintext[-1]].rstrip(b"\x00")
+        try:
+            return stamp, json.loads(plaintext)
+        except ValueError:
+            # let python-miio apply its fixes for malformed payloads
+            return stamp, Message.parse(packet, token=self.token).data.value
+
+
+def parse_hello(packet: bytes) -> Tuple[bytes, int]:
+    """Return the device id and stamp of a hello response."""
+    _, _, _, device_id, stamp = HEADER.unpack(packet[:HEADER.size])
+    return device_id, stamp
+
+
+class _Waiter:
+    """A request waiting for its response."""
+
+    __slots__ = ("event", "message", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.message = None
+        self.error: Exception | None = None
+
+
+class SharedTransport:
+    """One UDP socket for the requests to all devices.
+
+    A receiver thread reads every datagram, decrypts it with the codec of
+    the device it came from and hands it to the request waiting for that
+    (address, message id). A hello response goes to every hello pending
+    for the address. Late responses of timed out requests find no waiter
+    and are dropped, so they can no longer be taken for the answer to the
+    next request.
+    """
+
+    def __init__(self) -> None:
+        self._socket: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._waiters: Dict[Tuple[str, int], List[_Waiter]] = {}
+        self._codecs: Dict[str, MessageCodec] = {}
+        self._discovered: Dict[str, bytes] | None = None
+
+    def _start(self) -> socket.socket:
+        """Open the socket and start the receiver on first use."""
+        with self._lock:
+            if self._socket is None:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+                sock.bind(("", 0))
+                sock.settimeout(1)
+                self._socket = sock
+                self._thread = threading.Thread(
+                    target=self._receive, args=(sock,), name="xiaomi_airquality_udp", daemon=True)
+                self._thread.start()
+                _LOGGER.debug("Shared socket listening on port %s", sock.getsockname()[1])
+            return self._socket
+
+    def close(self) -> None:
+        """Close the socket, stopping the receiver."""
+        with self._lock:
+            sock, self._socket = self._socket, None
+        if sock is not None:
+            sock.close()
+
+    def _receive(self, sock: socket.socket) -> None:
+        """Dispatch the received datagrams to their waiters."""
+        while self._socket is sock:
+            try:
+                data, (address, _) = sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            try:
+                self._dispatch(address, data)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handling a datagram from %s", address)
+
+    def _dispatch(self, address: str, data: bytes) -> None:
+        """Hand a datagram to the request it answers."""
+        if len(data) == HELLO_LENGTH:
+            discovered = self._discovered
+            if discovered is not None:
+                discovered[address] = parse_hello(data)[0]
+            for waiter in list(self._waiters.get((address, HELLO_ID), ())):
+                waiter.message = parse_hello(data)
+                waiter.event.set()
+            return
+
+        codec = self._codecs.get(address)
+        if codec is None:
+            return
+        try:
+            message = codec.decode(data)
+        except InvalidToken as ex:
+            for (waiter_address, _), waiters in list(self._waiters.items()):
+                if waiter_address == address:
+                    for waiter in list(waiters):
+                        waiter.error = ex
+                        waiter.event.set()
+            return
+        for waiter in list(self._waiters.get((address, message[1].get("id")), ())):
+            if not waiter.event.is_set():
+                waiter.message = message
+                waiter.event.set()
+                return
+        _LOGGER.debug("Dropping unexpected response from %s", address)
+
+    def request(
+        self,
+        address: str,
+        data: bytes,
+        message_id: int,
+        codec: MessageCodec | None,
+        timeout: float
+    ):
+        """Send a datagram and return the response to it.
+
+        That is (device id, stamp) for a hello, else (stamp, payload).
+        Raises socket.timeout when no response arrives in time.
+        """
+        sock = self._start()
+        key = (address, message_id)
+        waiter = _Waiter()
+        if codec is not None:
+            self._codecs[address] = codec
+        with self._lock:
+            self._waiters.setdefault(key, []).append(waiter)
+        try:
+            sock.sendto(data, (address, MIIO_PORT))
+            if not waiter.event.wait(timeout):
+                raise socket.timeout(f"No response from {address}")
+            if waiter.error is not None:
+                raise waiter.error
+            return waiter.message
+        finally:
+            with self._lock:
+                waiters = self._waiters[key]
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[key]
+
+    def discover(self, timeout: float = 3) -> Dict[str, bytes]:
+        """Broadcast a hello and return the device id of each address answering."""
+        sock = self._start()
+        with self._lock:
+            if self._discovered is not None:
+                raise DeviceException("Discovery already running")
+            self._discovered = discovered = {}
+        try:
+            for _ in range(3):
+                sock.sendto(HELLO, ("<broadcast>", MIIO_PORT))
+            time.sleep(timeout)
+        finally:
+            self._discovered = None
+        return discovered
+
+
+def _from_stamp(stamp: float) -> datetime:
+    """Return a device stamp as the naive UTC datetime MiIOProtocol keeps."""
+    return datetime.fromtimestamp(stamp, timezone.utc).replace(tzinfo=None)
+
+
+class SharedMiIOProtocol(MiIOProtocol):
+    """miIO protocol sending through a SharedTransport instead of a socket per request.
+
+    The session of the device, its id and the offset of its clock, can be
+    saved and restored, so a restarted client skips the hello.
+    """
+
+    def __init__(self, transport: SharedTransport, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._transport = transport
+        self._codec = MessageCodec(self.token)
+
+    @property
+    def session(self) -> Dict[str, Any] | None:
+        """Return the state needed to skip the next hello."""
+        if not self._discovered:
+            return None
+        return {
+            "device_id": self._device_id.hex(),
+            "stamp_offset": calendar.timegm(self._device_ts.timetuple()) - time.time()
+        }
+
+    def restore(self, session: Dict[str, Any]) -> None:
+        """Resume a session saved earlier."""
+        self._device_id = bytes.fromhex(session["device_id"])
+        self._device_ts = _from_stamp(time.time() + session["stamp_offset"])
+        self._discovered = True
+
+    def send_handshake(self, *, retry_count=3):
+        """Send a hello to the device and keep its id and stamp."""
+        for attempt in range(retry_count + 1):
+            try:
+                device_id, stamp = self._transport.request(
+                    self.ip, HELLO, HELLO_ID, None, self._timeout)
+                break
+            except OSError as ex:
+                if attempt == retry_count:
+                    _LOGGER.debug("Unable to discover a device at address %s", self.ip)
+                    raise DeviceException("Unable to discover the device %s" % self.ip) from ex
+
+        self._device_id = device_id
+        self._device_ts = _from_stamp(stamp)
+        self._discovered = True
+        return device_id, stamp
+
+    def send(
+        self,
+        command: str,
+        parameters: Any = None,
+        retry_count: int = 3,
+        *,
+        extra_parameters: Dict = None
+    ) -> Any:
+        """Build and send a command, like MiIOProtocol.send, on the shared socket."""
+        if not self.lazy_discover or not self._discovered:
+            self.send_handshake()
+
+        request = self._create_request(command, parameters, extra_parameters)
+        data = self._codec.encode(
+            request,
+            self._device_id,
+            calendar.timegm((self._device_ts + timedelta(seconds=1)).timetuple())
+        )
+        _LOGGER.debug("%s:%s >>: %s", self.ip, self.port, request)
+
+        try:
+            stamp, payload = self._transport.request(
+                self.ip, data, request["id"], self._codec, self._timeout)
+            # the message id counter is private to MiIOProtocol
+            self._MiIOProtocol__id = payload["id"]  # pylint: disable=invalid-name,attribute-defined-outside-init
+            self._device_ts = _from_stamp(stamp)
+            _LOGGER.debug("%s:%s << %s", self.ip, self.port, payload)
+            if "error" in payload:
+                error = payload["error"]
+                if error.get("code") in RECOVERABLE_ERRORS:
+                    raise RecoverableError(error)
+                raise DeviceError(error)
+            return payload.get("result", payload)
+        except OSError as ex:
+            if retry_count > 0:
+                _LOGGER.debug("Retrying with incremented id, retries left: %s", retry_count)
+                self._MiIOProtocol__id += 100  # pylint: disable=invalid-name
+                self._discovered = False
+                return self.send(
+                    command, parameters, retry_count - 1, extra_parameters=extra_parameters)
+            _LOGGER.error("Got error when receiving: %s", ex)
+            raise DeviceException("No response from the device") from ex
+        except RecoverableError as ex:
+            if retry_count > 0:
+                _LOGGER.debug("Retrying to send failed command, retries left: %s", retry_count)
+                return self.send(
+                    command, parameters, retry_count - 1, extra_parameters=extra_parameters)
+            _LOGGER.error("Got error when receiving: %s", ex)
+            raise DeviceException("Unable to recover failed command") from ex
+
+
+@lru_cache(maxsize=None)
+def _warn_unsupported(missing: Tuple[str, ...]) -> None:
+    """Log once that the shared transport cannot be used."""
+    _LOGGER.warning(
+        "The installed python-miio lacks %s, devices keep a socket per request",
+        ", ".join(missing))
+
+
+def use_shared_transport(device, transport: SharedTransport) -> SharedMiIOProtocol | None:
+    """Make a device send through the shared transport, returning its new protocol.
+
+    Keeps the stock protocol of the device and returns None when the
+    installed python-miio lacks the internals the shared one builds on.
+    """
+    protocol = device._protocol  # pylint: disable=protected-access
+    missing = tuple(name for name in PROTOCOL_INTERNALS if not hasattr(protocol, name))
+    if missing:
+        _warn_unsupported(missing)
+        return None
+    device._protocol = SharedMiIOProtocol(  # pylint: disable=protected-access
+        transport,
+        protocol.ip,
+        protocol.token.hex(),
+        protocol.raw_id,
+        protocol.debug,
+        protocol.lazy_discover,
+        protocol._timeout  # pylint: disable=protected-access
+    )
+    return device._protocol  # pylint: disable=protected-access
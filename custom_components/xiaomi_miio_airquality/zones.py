@@ -0,0 +1,119 @@
+"""Zone aggregates of the Xiaomi Mi/QingPing Air Quality Monitor component."""
+from bisect import bisect_left, insort
+from typing import Callable, Dict
+
+from .history import percentile
+
+ZONE_METRICS = ("co2", "pm25", "temperature", "humidity")
+
+ZONE_STATISTICS = ("mean", "max", "p90")
+
+
+class ZoneStatistic:
+    """Aggregate of one reading over the members of a zone.
+
+    Keeps the latest value of each member, their running sum and a sorted
+    list of the values, so a member report costs two binary searches and
+    the mean, max and percentiles are read without a pass over the
+    members.
+    """
+
+    def __init__(self) -> None:
+        self._values: Dict[str, float] = {}
+        self._sorted: list[float] = []
+        self._total = 0.0
+
+    def update(self, member: str, value: float | None) -> None:
+        """Replace the value of a member, None removes it."""
+        old = self._values.pop(member, None)
+        if old is not None:
+            del self._sorted[bisect_left(self._sorted, old)]
+            self._total -= old
+        if value is None or isinstance(value, str) or value != value:
+            if not self._values:
+                self._total = 0.0
+            return
+        self._values[member] = value
+        insort(self._sorted, value)
+        self._total += value
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean over the members."""
+        return round(self._total / len(self._sorted), 2) if self._sorted else None
+
+    @property
+    def max(self) -> float | None:
+        """Return the maximum over the members."""
+        return self._sorted[-1] if self._sorted else None
+
+    @property
+    def p90(self) -> float | None:
+        """Return the 90th percentile over the members."""
+        value = percentile(self._sorted, 90)
+        return None if value is None else round(value, 2)
+
+
+class Zone:
+    """Group of monitors aggregated together.
+
+    The zone sensors belong to one member entry, the owner. Each member
+    entry registers a function adding the zone sensors to its sensor
+    platform, so another member takes them over when the owner leaves.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.owner: str | None = None
+        self.members: set[str] = set()
+        self.statistics = {metric: ZoneStatistic() for metric in ZONE_METRICS}
+        self.adopters: Dict[str, Callable[[], None]] = {}
+        self._listeners: list[Callable[[], None]] = []
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call listener() whenever the aggregates change.
+
+        Returns a function removing the listener again.
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _notify(self) -> None:
+        for listener in list(self._listeners):
+            listener()
+
+    def update(self, member: str, status) -> None:
+        """Take the readings of a member status."""
+        self.members.add(member)
+        for metric, statistic in self.statistics.items():
+            statistic.update(member, getattr(status, metric, None))
+        self._notify()
+
+    def remove(self, member: str) -> None:
+        """Drop a member and its readings."""
+        self.members.discard(member)
+        for statistic in self.statistics.values():
+            statistic.update(member, None)
+        self._notify()
+
+    def adopt(self, entry_id: str, adopter: Callable[[], None]) -> None:
+        """Register how an entry adds the zone sensors, adding them if the zone has no owner."""
+        self.adopters[entry_id] = adopter
+        if self.owner is None:
+            self.owner = entry_id
+        if self.owner == entry_id:
+            adopter()
+
+    def release(self, entry_id: str) -> None:
+        """Forget an entry, handing the zone sensors to another one if it owned them."""
+        self.adopters.pop(entry_id, None)
+        if self.owner != entry_id:
+            return
+        self.owner = None
+        for other, adopter in self.adopters.items():
+            self.owner = other
+            adopter()
+            break